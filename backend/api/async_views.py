@@ -0,0 +1,113 @@
+"""
+Async variants of the data, indicator, prediction and market overview views.
+
+They are served by the ASGI entry point (see ``settings.API_ASYNC_VIEWS``)
+and behave exactly like their counterparts in ``views.py``, but never block
+the event loop: DRF's request setup, the handlers' blocking work and the
+response rendering all run in the I/O thread pool. A request's own steps
+still run one after another (each endpoint makes a single upstream fetch);
+what runs side by side is different requests, up to the size of the pool.
+"""
+import asyncio
+
+from rest_framework.views import APIView
+
+from .services.async_io import iterate_blocking, run_blocking
+from .views import (MarketOverviewView, PredictionBatchView, PredictionView,
+                    StockDataBatchView, StockDataView, TechnicalIndicatorView)
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers may be coroutines.
+
+    Mirrors ``APIView.dispatch``; the synchronous steps that may touch the
+    database or burn CPU (authentication, rendering) run in the I/O pool.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await run_blocking(self.initial, request, *args, **kwargs)
+
+            # Get the appropriate handler method
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(),
+                                  self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+
+        if getattr(self.response, 'streaming', False):
+            if not self.response.is_async:
+                self.response.streaming_content = iterate_blocking(
+                    self.response.streaming_content)
+        elif hasattr(self.response, 'render'):
+            await run_blocking(self.response.render)
+
+        return self.response
+
+
+class AsyncStockDataView(AsyncAPIView, StockDataView):
+    """Async API view to retrieve stock data."""
+
+    async def get(self, request, symbol):
+        """Get stock data for a specific symbol."""
+        return await run_blocking(StockDataView.get, self, request, symbol)
+
+
+class AsyncStockDataBatchView(AsyncAPIView, StockDataBatchView):
+    """Async API view to retrieve stock data for several symbols at once."""
+
+    async def post(self, request):
+        """Get stock data for a list of symbols with one upstream download."""
+        return await run_blocking(StockDataBatchView.post, self, request)
+
+
+class AsyncTechnicalIndicatorView(AsyncAPIView, TechnicalIndicatorView):
+    """Async API view to calculate technical indicators."""
+
+    async def get(self, request):
+        """Calculate technical indicators from query parameters."""
+        return await run_blocking(TechnicalIndicatorView.get, self, request)
+
+    async def post(self, request):
+        """Calculate technical indicators for a specific stock."""
+        return await run_blocking(TechnicalIndicatorView.post, self, request)
+
+
+class AsyncPredictionView(AsyncAPIView, PredictionView):
+    """Async API view to make stock price predictions."""
+
+    async def post(self, request):
+        """Make predictions for a specific stock using the specified model."""
+        return await run_blocking(PredictionView.post, self, request)
+
+
+class AsyncPredictionBatchView(AsyncAPIView, PredictionBatchView):
+    """Async API view to make predictions for many symbols and models at once."""
+
+    async def post(self, request):
+        """Forecast a list of items, streaming results as they complete."""
+        return await run_blocking(PredictionBatchView.post, self, request)
+
+
+class AsyncMarketOverviewView(AsyncAPIView, MarketOverviewView):
+    """Async API view to get market overview data."""
+
+    async def get(self, request):
+        """Get overview of the Indian market indices."""
+        return await run_blocking(MarketOverviewView.get, self, request)
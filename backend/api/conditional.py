@@ -0,0 +1,74 @@
+"""
+Conditional GET helpers.
+
+Views compute a validator from the version of the data behind a response
+(e.g. the latest bar and the request parameters) before building the body,
+and answer ``If-None-Match`` / ``If-Modified-Since`` with 304 Not Modified
+when the client already holds that version.
+"""
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import http_date
+
+
+def compute_etag(*parts):
+    """
+    Build a strong ETag from the parts identifying a response.
+
+    Args:
+        *parts: Values whose ``repr`` identifies the response body, such as
+            the symbol, the request parameters and the data version.
+
+    Returns:
+        str: Quoted ETag value.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Return a 304 response if the client's cached copy is still current.
+
+    Args:
+        request: The incoming request.
+        etag (str): ETag of the current response.
+        last_modified (datetime): Time the underlying data last changed,
+            when known (e.g. when a snapshot was taken).
+
+    Returns:
+        HttpResponse or None: 304 Not Modified carrying the validators, or
+        None if the full response has to be built.
+    """
+    response = get_conditional_response(request, etag=etag,
+                                        last_modified=_timestamp(last_modified))
+    if response is None:
+        return None
+    return set_validators(response, etag, last_modified)
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Attach the validators and caching headers to a response.
+
+    ``Cache-Control`` lets shared caches (CDNs) reuse the response for
+    ``settings.HTTP_CACHE_MAX_AGE`` seconds and revalidate it afterwards;
+    responses vary by ``Accept`` since it selects the renderer.
+    """
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(_timestamp(last_modified))
+    patch_cache_control(response, public=True,
+                        max_age=settings.HTTP_CACHE_MAX_AGE)
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def _timestamp(value):
+    """Seconds since the epoch of a datetime, or None."""
+    if value is None:
+        return None
+    return int(value.timestamp())
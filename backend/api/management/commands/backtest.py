@@ -0,0 +1,91 @@
+"""
+Walk-forward backtest of the prediction models over the stock universe.
+
+Usage: python manage.py backtest [--workers N] [--source popular|db|all]
+                                 [--symbols SYM ...] [--models TYPE ...]
+                                 [--timeframe 5y] [--train-window BARS]
+                                 [--horizon BARS] [--step BARS] [--json PATH]
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.backtest import (BACKTEST_TIMEFRAME, HORIZON, STEP,
+                                   TRAIN_WINDOW, backtest_universe,
+                                   summarize_backtest)
+from api.services.universe import (add_universe_arguments,
+                                   symbols_from_options, write_summary)
+
+
+class Command(BaseCommand):
+    help = ("Roll a training window over each symbol's history and report "
+            "MAE, RMSE and directional accuracy of every prediction model.")
+
+    def add_arguments(self, parser):
+        add_universe_arguments(parser, 'Model types to evaluate (default: all)')
+        parser.add_argument(
+            '--timeframe', default=BACKTEST_TIMEFRAME,
+            help=f'History to evaluate over (default: {BACKTEST_TIMEFRAME})')
+        parser.add_argument(
+            '--train-window', type=int, default=TRAIN_WINDOW,
+            help=f'Bars in each training window (default: {TRAIN_WINDOW})')
+        parser.add_argument(
+            '--horizon', type=int, default=HORIZON,
+            help=f'Bars forecast at each fold (default: {HORIZON})')
+        parser.add_argument(
+            '--step', type=int, default=STEP,
+            help=f'Bars between folds (default: {STEP})')
+        parser.add_argument(
+            '--json', metavar='PATH',
+            help='Also write the per-symbol results and summary to PATH')
+
+    def handle(self, *args, **options):
+        symbols = symbols_from_options(options)
+        for option in ('train_window', 'horizon', 'step'):
+            if options[option] < 1:
+                raise CommandError(f"--{option.replace('_', '-')} must be at least 1")
+
+        self.stdout.write(f"Backtesting {len(symbols)} symbols "
+                          f"with {options['workers'] or 'default'} workers")
+        started = time.perf_counter()
+
+        results = backtest_universe(
+            symbols, model_types=options['models'],
+            timeframe=options['timeframe'],
+            train_window=options['train_window'], horizon=options['horizon'],
+            step=options['step'], workers=options['workers'],
+            on_result=self.report)
+        summary = summarize_backtest(results)
+
+        self.stdout.write('All symbols:')
+        for model_type, metrics in summary.items():
+            self.stdout.write(f"  {self.format_metrics(model_type, metrics)}")
+
+        if options['json']:
+            with open(options['json'], 'w') as handle:
+                json.dump({'results': results, 'summary': summary}, handle,
+                          indent=2)
+
+        write_summary(self, results, 'backtested',
+                      time.perf_counter() - started)
+
+    def report(self, result):
+        """Print the metrics of each model as a symbol finishes."""
+        if 'error' in result:
+            self.stderr.write(f"{result['symbol']}: failed: {result['error']}")
+            return
+
+        self.stdout.write(f"{result['symbol']}: {result['folds']} folds")
+        for model_type, metrics in result['models'].items():
+            self.stdout.write(f"  {self.format_metrics(model_type, metrics)}")
+
+    @staticmethod
+    def format_metrics(model_type, metrics):
+        """One line of metrics; '-' where there was nothing to score."""
+        def value(name, pattern):
+            return '-' if metrics[name] is None else pattern.format(metrics[name])
+
+        return (f"{model_type:<14} forecasts={metrics['forecasts']} "
+                f"mae={value('mae', '{:.4f}')} rmse={value('rmse', '{:.4f}')} "
+                f"direction={value('directional_accuracy', '{:.1%}')}")
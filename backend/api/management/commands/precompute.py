@@ -0,0 +1,56 @@
+"""
+Precompute indicators, fitted models and forecasts for the stock universe.
+
+Usage: python manage.py precompute [--workers N] [--source popular|db|all]
+                                   [--symbols SYM ...] [--models TYPE ...]
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.services.precompute import TRAINING_TIMEFRAME, precompute_universe
+from api.services.universe import (add_universe_arguments,
+                                   symbols_from_options, write_summary)
+
+
+class Command(BaseCommand):
+    help = ("Refresh history, compute indicators, fit every prediction model "
+            "and store forecasts for each symbol, across a process pool.")
+
+    def add_arguments(self, parser):
+        add_universe_arguments(parser, 'Model types to fit (default: all)')
+        parser.add_argument(
+            '--timeframe', default=TRAINING_TIMEFRAME,
+            help=f'Training window (default: {TRAINING_TIMEFRAME})')
+        parser.add_argument(
+            '--days', type=int, default=settings.PRECOMPUTE_FORECAST_DAYS,
+            help='Forecast horizon in days')
+
+    def handle(self, *args, **options):
+        symbols = symbols_from_options(options)
+
+        self.stdout.write(f"Precomputing {len(symbols)} symbols "
+                          f"with {options['workers'] or 'default'} workers")
+        started = time.perf_counter()
+
+        results = precompute_universe(
+            symbols, model_types=options['models'],
+            timeframe=options['timeframe'], horizon=options['days'],
+            workers=options['workers'], on_result=self.report)
+
+        write_summary(self, results, 'precomputed',
+                      time.perf_counter() - started)
+
+    def report(self, result):
+        """Print one line per finished symbol with its stage timings."""
+        if 'error' in result:
+            self.stderr.write(f"{result['symbol']}: failed: {result['error']}")
+            return
+
+        timings = result['timings']
+        stages = ' '.join(f"{stage}={seconds * 1000:.0f}ms"
+                          for stage, seconds in timings.items())
+        self.stdout.write(f"{result['symbol']}: {result['rows']} bars, "
+                          f"{result['models']} forecasts, "
+                          f"total={sum(timings.values()) * 1000:.0f}ms {stages}")
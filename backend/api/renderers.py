@@ -0,0 +1,135 @@
+"""
+Custom DRF renderers.
+"""
+import datetime
+
+import numpy as np
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson, falling back to DRF's encoder.
+
+    orjson serializes lists of floats and NumPy arrays in C, which is where
+    the bulk series endpoints spend their time. Indented output (requested
+    through the ``Accept`` header) and setups without orjson are handled by
+    the stock ``JSONRenderer``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if orjson is None or self.get_indent(accepted_media_type or '',
+                                             renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            return orjson.dumps(
+                data,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Types orjson does not know (e.g. Decimal, lazy strings)
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+
+
+class ArrowIPCRenderer(BaseRenderer):
+    """
+    Renders columnar series payloads as an Arrow IPC stream.
+
+    Expects the ``as_arrays`` columnar payload (``dates`` plus ``columns`` of
+    NumPy arrays), so Arrow columns are built from whole float64 and
+    datetime64 arrays rather than from Python objects; the arrays themselves
+    are converted from the frame (dates parsed, values rounded if asked).
+    Any other top-level fields (e.g. ``symbol``) travel as schema metadata.
+    Payloads without columns, such as errors, become a single-row table of
+    their fields.
+    """
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if isinstance(data, dict) and 'columns' in data:
+            arrays = {'Date': pa.array(data.get('dates', []))}
+            arrays.update({name: pa.array(values)
+                           for name, values in data['columns'].items()})
+            metadata = {
+                str(key): str(value) for key, value in data.items()
+                if key not in ('dates', 'columns')
+            }
+            table = pa.table(arrays, metadata=metadata)
+        else:
+            table = pa.table({str(key): [str(value)]
+                              for key, value in dict(data).items()})
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders responses as MessagePack.
+
+    NumPy arrays are packed as lists of floats (dates as ISO strings), so
+    clients need nothing beyond a MessagePack decoder.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
+
+
+def _msgpack_default(value):
+    """Convert NumPy values msgpack cannot pack natively."""
+    if isinstance(value, np.ndarray):
+        if np.issubdtype(value.dtype, np.datetime64):
+            return np.datetime_as_string(value, unit='D').tolist()
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__} to MessagePack")
+
+
+# Binary renderers whose libraries are installed, for the bulk series views
+BINARY_RENDERERS = [
+    renderer for renderer, module in ((ArrowIPCRenderer, pa),
+                                      (MessagePackRenderer, msgpack))
+    if module is not None
+]
+
+
+def is_binary_renderer(renderer):
+    """Return True if ``renderer`` wants the NumPy-array columnar payload."""
+    return getattr(renderer, 'render_style', 'text') == 'binary'
@@ -1,5 +1,17 @@
 from rest_framework import serializers
 from .models import StockSymbol, PredictionModel
+from .services.downsampling import DOWNSAMPLE_METHODS, MIN_POINTS
+from .services.prediction_service import MODEL_FITTERS, validate_model_parameters
+from .services.serialization import MAX_PRECISION, RESPONSE_LAYOUTS
+from .services.technical_indicators import resolve_indicator_requests
+
+def validate_date_range(attrs):
+    """Raise a validation error if ``start_date`` is after ``end_date``."""
+    start_date = attrs.get('start_date')
+    end_date = attrs.get('end_date')
+    if start_date and end_date and start_date > end_date:
+        raise serializers.ValidationError(
+            {'end_date': 'end_date must not be before start_date.'})
 
 class StockSymbolSerializer(serializers.ModelSerializer):
     """Serializer for stock symbols."""
@@ -20,6 +32,20 @@ class StockDataSerializer(serializers.Serializer):
     start_date = serializers.DateField(required=False)
     end_date = serializers.DateField(required=False)
 
+    def validate(self, attrs):
+        """Check that the date range is not reversed."""
+        validate_date_range(attrs)
+        return attrs
+
+class StockDataBatchSerializer(serializers.Serializer):
+    """Serializer for batched stock data requests."""
+    symbols = serializers.ListField(
+        child=serializers.CharField(max_length=20),
+        allow_empty=False,
+        max_length=100
+    )
+    timeframe = serializers.CharField(max_length=20, default='1y')
+
 class TechnicalIndicatorSerializer(serializers.Serializer):
     """Serializer for technical indicators."""
     symbol = serializers.CharField(max_length=20)
@@ -27,8 +53,36 @@ class TechnicalIndicatorSerializer(serializers.Serializer):
     indicators = serializers.ListField(
         child=serializers.CharField(max_length=50)
     )
+    parameters = serializers.DictField(required=False)
     start_date = serializers.DateField(required=False)
     end_date = serializers.DateField(required=False)
+    layout = serializers.ChoiceField(choices=RESPONSE_LAYOUTS, default='records')
+    precision = serializers.IntegerField(min_value=0, max_value=MAX_PRECISION,
+                                         required=False)
+    points = serializers.IntegerField(min_value=MIN_POINTS, required=False)
+    downsample = serializers.ChoiceField(choices=DOWNSAMPLE_METHODS,
+                                         default='lttb')
+
+    def validate(self, attrs):
+        """Check the date range and that the indicator parameter sets can be resolved."""
+        validate_date_range(attrs)
+        try:
+            resolve_indicator_requests(attrs['indicators'],
+                                       attrs.get('parameters'))
+        except ValueError as e:
+            raise serializers.ValidationError({'parameters': str(e)})
+        return attrs
+
+class ScreenerQuerySerializer(serializers.Serializer):
+    """Serializer for stock screener queries."""
+    filter = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        required=False,
+        default=list
+    )
+    sector = serializers.CharField(max_length=100, required=False)
+    sort = serializers.CharField(max_length=50, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=500, default=50)
 
 class PredictionRequestSerializer(serializers.Serializer):
     """Serializer for prediction requests."""
@@ -39,3 +93,26 @@ class PredictionRequestSerializer(serializers.Serializer):
         child=serializers.CharField(),
         required=False
     )
+    parameters = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        """Check the parameter names against the model's fit function."""
+        # Unknown model types are reported by the view
+        if attrs.get('parameters') and attrs['model_type'] in MODEL_FITTERS:
+            try:
+                validate_model_parameters(attrs['model_type'],
+                                          attrs['parameters'])
+            except ValueError as e:
+                raise serializers.ValidationError({'parameters': str(e)})
+        return attrs
+
+class PredictionBatchItemSerializer(serializers.Serializer):
+    """Serializer for one item of a batched prediction request."""
+    symbol = serializers.CharField(max_length=20)
+    model_type = serializers.CharField(max_length=20)
+    days_to_predict = serializers.IntegerField(min_value=1, max_value=365)
+
+class PredictionBatchSerializer(serializers.Serializer):
+    """Serializer for batched prediction requests."""
+    items = PredictionBatchItemSerializer(many=True, allow_empty=False,
+                                          max_length=200)
@@ -0,0 +1,58 @@
+"""
+Helpers for calling the blocking services from async views.
+
+Upstream downloads, history files and model fits are all blocking, so async
+views hand them to a dedicated thread pool and await the result. The pool is
+sized for I/O (``settings.ASYNC_IO_WORKERS``) rather than for CPU, so many
+requests can each wait on their own upstream call while the event loop keeps
+accepting new ones.
+
+The pool threads are not managed by Django's request cycle, so every call
+closes the database connections it leaves unusable or past
+``CONN_MAX_AGE``, as Django does at the end of a request.
+"""
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_executor_guard = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_guard:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.ASYNC_IO_WORKERS,
+                                           thread_name_prefix='async-io')
+        return _executor
+
+
+def _call_closing_connections(fn, *args, **kwargs):
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking call in the I/O thread pool and await its result."""
+    call = functools.partial(_call_closing_connections, fn, *args, **kwargs)
+    return await sync_to_async(call, thread_sensitive=False,
+                               executor=_get_executor())()
+
+
+async def iterate_blocking(iterator):
+    """Consume a blocking iterator from async code, one item per pool call."""
+    iterator = iter(iterator)
+    sentinel = object()
+    while True:
+        item = await run_blocking(next, iterator, sentinel)
+        if item is sentinel:
+            return
+        yield item
@@ -0,0 +1,281 @@
+"""
+Walk-forward evaluation of the prediction models.
+
+A training window of fixed length is rolled over each symbol's history.
+At every step (a fold) each model is fitted on the window and forecasts the
+next ``horizon`` bars, which are compared with the closes that actually
+followed. Errors are reported per model and symbol as MAE, RMSE and
+directional accuracy (whether the forecast moved the same way from the last
+training close as the price did).
+
+Indicators are computed once per symbol over the whole history, in one
+panel pass for the universe, and each fold takes a slice of them. Every
+indicator value only uses bars up to its own, so nothing leaks from the
+test bars into a fold. The values are not the ones the fold's bars alone
+would give, though: the EMA and MACD seeds and the SMA_200 warm-up come from
+earlier history. Folds are grouped into chunks and the (symbol, chunk) tasks
+run across a process pool.
+"""
+import math
+import os
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+
+from .batch_prediction import PREDICTION_INDICATORS, batch_indicators
+from .data_service import get_stock_data_many, normalize_symbol
+from .prediction_service import MODEL_FITTERS, fit_model, forecast
+from .universe import worker_pool
+
+# History evaluated by default
+BACKTEST_TIMEFRAME = '5y'
+
+# Bars in each training window (about two years, as the prediction endpoint)
+TRAIN_WINDOW = 500
+
+# Bars forecast at each fold
+HORIZON = 5
+
+# Bars the training window moves between folds
+STEP = 5
+
+# Error sums a task returns per model; metrics are derived from their totals
+_SUMS = ('forecasts', 'abs_error', 'squared_error', 'directions', 'hits')
+
+
+def walk_forward_folds(rows, train_window=TRAIN_WINDOW, horizon=HORIZON,
+                       step=STEP):
+    """
+    Split ``rows`` bars into walk-forward folds.
+
+    Returns:
+        list: ``(train_start, train_end)`` row positions of each fold; its
+        test bars are ``train_end`` to ``train_end + horizon``.
+    """
+    return [(end - train_window, end)
+            for end in range(train_window, rows - horizon + 1, step)]
+
+
+def _predict_prices(model, horizon):
+    """
+    Forecast ``horizon`` bars as a price array, or None without a model.
+
+    Forecast steps are matched to the following bars by position, so the
+    forecast dates are not needed.
+    """
+    if model is None:
+        return None
+    if hasattr(model, 'predict_prices'):
+        values = model.predict_prices(horizon)
+    else:
+        values = forecast(model, horizon)['Predicted_Price'].to_numpy()
+
+    predicted = np.full(horizon, np.nan)
+    values = np.asarray(values, dtype='float64')[:horizon]
+    predicted[:len(values)] = values
+    return predicted
+
+
+def evaluate_folds(model_types, features, closes, folds, horizon=HORIZON):
+    """
+    Fit and score every model on a list of folds of one symbol.
+
+    Args:
+        model_types (list): Model types to evaluate.
+        features (pandas.DataFrame): Indicators over the whole history.
+        closes (numpy.ndarray): Closes aligned with ``features``.
+        folds (list): ``(train_start, train_end)`` pairs.
+        horizon (int): Bars forecast per fold.
+
+    Returns:
+        dict: Model type to error sums (see ``backtest_metrics``).
+    """
+    sums = {model_type: dict.fromkeys(_SUMS, 0.0) for model_type in model_types}
+
+    for train_start, train_end in folds:
+        window = features.iloc[train_start:train_end]
+        actual = closes[train_end:train_end + horizon]
+        last_close = closes[train_end - 1]
+
+        for model_type in model_types:
+            predicted = _predict_prices(fit_model(model_type, window), horizon)
+            if predicted is None:
+                continue
+
+            valid = np.isfinite(predicted)
+            if not valid.any():
+                continue
+
+            errors = predicted[valid] - actual[valid]
+            moved = np.sign(actual[valid] - last_close)
+            called = np.sign(predicted[valid] - last_close)
+
+            model_sums = sums[model_type]
+            model_sums['forecasts'] += valid.sum()
+            model_sums['abs_error'] += np.abs(errors).sum()
+            model_sums['squared_error'] += np.square(errors).sum()
+            # Bars where the price did not move have no direction to call
+            model_sums['directions'] += (moved != 0).sum()
+            model_sums['hits'] += ((moved != 0) & (moved == called)).sum()
+
+    return {model_type: {name: float(value) for name, value in model_sums.items()}
+            for model_type, model_sums in sums.items()}
+
+
+def backtest_metrics(sums):
+    """
+    Turn error sums into metrics.
+
+    Returns:
+        dict: 'forecasts' scored, 'mae', 'rmse', 'directions' (forecasts
+        where the price moved) and 'directional_accuracy' (share of those
+        whose direction was called correctly); None where there was nothing
+        to score.
+    """
+    forecasts = sums['forecasts']
+    return {
+        'forecasts': int(forecasts),
+        'directions': int(sums['directions']),
+        'mae': sums['abs_error'] / forecasts if forecasts else None,
+        'rmse': math.sqrt(sums['squared_error'] / forecasts) if forecasts else None,
+        'directional_accuracy': (sums['hits'] / sums['directions']
+                                 if sums['directions'] else None),
+    }
+
+
+def _merge_sums(total, sums):
+    for name in _SUMS:
+        total[name] += sums[name]
+
+
+def backtest_universe(symbols, model_types=None, timeframe=BACKTEST_TIMEFRAME,
+                      train_window=TRAIN_WINDOW, horizon=HORIZON, step=STEP,
+                      workers=None, chunks_per_worker=4, on_result=None):
+    """
+    Walk-forward backtest of the prediction models over a universe.
+
+    History is fetched with one batched download and indicators are
+    computed for all symbols together in the calling process; the folds of
+    each symbol are then split into chunks that run across a process pool.
+
+    Args:
+        symbols (list): Stock symbols.
+        model_types (list): Model types to evaluate; defaults to all.
+        timeframe (str): History to evaluate over.
+        train_window (int): Bars in each training window.
+        horizon (int): Bars forecast per fold.
+        step (int): Bars between folds.
+        workers (int): Worker processes; defaults to the CPU count.
+        chunks_per_worker (int): Tasks per worker to aim for, so symbols
+            with many folds do not leave the other workers idle.
+        on_result (callable): Called with each symbol's result as it
+            finishes.
+
+    Returns:
+        list: Per symbol, in completion order: 'symbol', 'folds' and
+        'models' (model type to ``backtest_metrics``), or 'symbol' and
+        'error'.
+    """
+    if model_types is None:
+        model_types = list(MODEL_FITTERS)
+    symbols = list(dict.fromkeys(normalize_symbol(symbol) for symbol in symbols))
+
+    frames = get_stock_data_many(symbols, timeframe)
+    results = []
+
+    def finish(result):
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    usable = {}
+    for symbol in symbols:
+        frame = frames[symbol]
+        folds = walk_forward_folds(len(frame), train_window, horizon, step)
+        if not folds:
+            finish({'symbol': symbol,
+                    'error': f"Not enough history: {len(frame)} bars, "
+                             f"{train_window + horizon} needed"})
+        else:
+            usable[symbol] = folds
+
+    if not usable:
+        return results
+
+    indicators = batch_indicators({symbol: frames[symbol] for symbol in usable},
+                                  PREDICTION_INDICATORS)
+
+    # Enough chunks for every worker to stay busy
+    workers = workers or os.cpu_count() or 1
+    total_folds = sum(len(folds) for folds in usable.values())
+    chunk_size = max(1, math.ceil(total_folds / (workers * chunks_per_worker)))
+
+    with worker_pool(workers) as pool:
+        futures = {}
+        for symbol, folds in usable.items():
+            features = pd.DataFrame(indicators[symbol])
+            closes = frames[symbol]['Close'].to_numpy(dtype='float64')
+            for start in range(0, len(folds), chunk_size):
+                future = pool.submit(evaluate_folds, model_types, features,
+                                     closes, folds[start:start + chunk_size],
+                                     horizon)
+                futures[future] = symbol
+
+        pending = {symbol: sum(1 for owner in futures.values() if owner == symbol)
+                   for symbol in usable}
+        totals = {symbol: {model_type: dict.fromkeys(_SUMS, 0.0)
+                           for model_type in model_types}
+                  for symbol in usable}
+        errors = {}
+
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                for model_type, sums in future.result().items():
+                    _merge_sums(totals[symbol][model_type], sums)
+            except Exception as e:
+                print(f"Error backtesting {symbol}: {e}")
+                errors[symbol] = str(e)
+
+            pending[symbol] -= 1
+            if pending[symbol]:
+                continue
+
+            if symbol in errors:
+                finish({'symbol': symbol, 'error': errors[symbol]})
+            else:
+                finish({
+                    'symbol': symbol,
+                    'folds': len(usable[symbol]),
+                    'models': {model_type: backtest_metrics(sums)
+                               for model_type, sums in totals[symbol].items()},
+                })
+
+    return results
+
+
+def summarize_backtest(results):
+    """
+    Pool the error sums of every symbol into one set of metrics per model.
+
+    Each symbol weighs by its number of scored forecasts.
+
+    Returns:
+        dict: Model type to ``backtest_metrics``.
+    """
+    totals = {}
+    for result in results:
+        for model_type, metrics in result.get('models', {}).items():
+            forecasts = metrics['forecasts']
+            if not forecasts:
+                continue
+            total = totals.setdefault(model_type, dict.fromkeys(_SUMS, 0.0))
+            total['forecasts'] += forecasts
+            total['abs_error'] += metrics['mae'] * forecasts
+            total['squared_error'] += metrics['rmse'] ** 2 * forecasts
+            if metrics['directions']:
+                total['directions'] += metrics['directions']
+                total['hits'] += (metrics['directional_accuracy']
+                                  * metrics['directions'])
+    return {model_type: backtest_metrics(sums) for model_type, sums in totals.items()}
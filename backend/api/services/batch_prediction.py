@@ -0,0 +1,172 @@
+"""
+Forecasts for many (symbol, model type, days) items in one go.
+
+The work a single prediction request does per symbol is shared across the
+batch: history for every symbol comes from one batched download, the
+indicators of all symbols are computed in one pass over a panel, and the
+model fits run in parallel through the prediction executor. Results are
+yielded as each forecast completes rather than once the whole batch is done.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+from django.conf import settings
+
+from .data_service import get_stock_data_many, normalize_symbol
+from .forecast_store import get_forecast_store
+from .indicator_cache import data_version
+from .model_registry import get_model_registry
+from .panel_indicators import Panel, calculate_panel_indicators
+from .precompute import TRAINING_TIMEFRAME
+from .prediction_executor import (PredictionQueueFull, PredictionTimeout,
+                                  get_prediction_executor)
+from .prediction_service import forecast
+
+# Indicators the prediction models are trained on
+PREDICTION_INDICATORS = ['sma', 'ema', 'rsi', 'macd', 'bollinger_bands']
+
+
+def batch_indicators(frames, indicators=None):
+    """
+    Calculate indicators for several symbols in one vectorized pass.
+
+    Each symbol's windows span its own bars, so the results equal the
+    single-symbol ones even when the symbols trade on different calendars.
+
+    Args:
+        frames (dict): Symbol to price window (the ``get_stock_data``
+            layout).
+        indicators (list): Indicator families to calculate.
+
+    Returns:
+        dict: Symbol to indicator dict, as ``get_cached_indicators`` returns.
+    """
+    if indicators is None:
+        indicators = PREDICTION_INDICATORS
+
+    panel = Panel.from_frames(frames)
+    values = calculate_panel_indicators(panel, indicators)
+
+    result = {}
+    for row, (symbol, frame) in enumerate(frames.items()):
+        columns = panel.dates.get_indexer(pd.DatetimeIndex(frame['Date']))
+        result[symbol] = {
+            name: pd.Series(array[row, columns], index=frame.index, name=name)
+            for name, array in values.items()
+        }
+        result[symbol]['Date'] = frame['Date']
+
+    return result
+
+
+def _outcome(index, item, predictions=None, **extra):
+    """Result dict of one batch item."""
+    outcome = {'index': index, 'symbol': item['symbol'],
+               'model_type': item['model_type'],
+               'days_predicted': item['days_to_predict']}
+    if predictions is not None:
+        outcome['predictions'] = predictions.to_dict(orient='records')
+    outcome.update(extra)
+    return outcome
+
+
+def _predict_item(index, item, symbol, indicators, version):
+    """Fit (or reuse) the item's model and forecast it."""
+    try:
+        model = get_model_registry().get_or_fit(
+            symbol, item['model_type'], indicators, version,
+            fit=get_prediction_executor().fit)
+        result = forecast(model, item['days_to_predict'])
+    except PredictionQueueFull as e:
+        return _outcome(index, item, error=str(e), retry_after=e.retry_after)
+    except PredictionTimeout as e:
+        return _outcome(index, item, error=str(e))
+    except Exception as e:
+        print(f"Error predicting {symbol} with {item['model_type']}: {e}")
+        return _outcome(index, item, error=str(e))
+
+    if result is None:
+        return _outcome(index, item,
+                        error="Could not generate prediction. Not enough data.")
+    return _outcome(index, item, result)
+
+
+def predict_batch(items, timeframe=TRAINING_TIMEFRAME, workers=None):
+    """
+    Forecast every item of a batch, returning results as they complete.
+
+    History is fetched, precomputed forecasts are looked up and indicators
+    are computed before this returns, so failures there reach the caller
+    as exceptions; only the model fits happen while the results are
+    consumed. Precomputed forecasts that match the latest bars come first;
+    the remaining items are fitted in parallel.
+
+    Args:
+        items (list): Dicts with 'symbol', 'model_type' and
+            'days_to_predict'.
+        timeframe (str): Training window.
+        workers (int): Items fitted at the same time; defaults to
+            ``settings.PREDICTION_WORKERS`` so a batch does not crowd other
+            requests out of the prediction executor.
+
+    Returns:
+        iterator: Per item, in completion order, a dict with its 'index' in
+        ``items``, 'symbol', 'model_type', 'days_predicted' and either
+        'predictions' or 'error' - or only 'index' and 'error' if the item
+        failed unexpectedly.
+    """
+    symbols = {index: normalize_symbol(item['symbol'])
+               for index, item in enumerate(items)}
+
+    # History for every symbol with one batched download
+    frames = get_stock_data_many(list(dict.fromkeys(symbols.values())),
+                                 timeframe)
+
+    store = get_forecast_store()
+    ready = []
+    pending = []
+    for index, item in enumerate(items):
+        data = frames[symbols[index]]
+        if data is None or data.empty:
+            ready.append(_outcome(index, item,
+                                  error=f"No data available for {item['symbol']}"))
+            continue
+
+        # Serve the precomputed forecast while it matches these bars
+        result = store.read(symbols[index], item['model_type'],
+                            data_version(data), item['days_to_predict'])
+        if result is not None:
+            ready.append(_outcome(index, item, result))
+        else:
+            pending.append(index)
+
+    # Indicators of every symbol still to fit, in one pass
+    needed = dict.fromkeys(symbols[index] for index in pending)
+    indicators = batch_indicators({symbol: frames[symbol] for symbol in needed})
+
+    tasks = [(index, items[index], symbols[index], indicators[symbols[index]],
+              data_version(frames[symbols[index]]))
+             for index in pending]
+    return _stream_outcomes(ready, tasks, workers)
+
+
+def _stream_outcomes(ready, tasks, workers=None):
+    """Yield the ready outcomes, then fit ``tasks`` and yield each as it completes."""
+    yield from ready
+    if not tasks:
+        return
+
+    pool = ThreadPoolExecutor(
+        max_workers=workers or max(settings.PREDICTION_WORKERS, 1),
+        thread_name_prefix='batch-predict')
+    try:
+        futures = {pool.submit(_predict_item, *task): task[0] for task in tasks}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                print(f"Error in batch item {futures[future]}: {e}")
+                yield {'index': futures[future], 'error': str(e)}
+    finally:
+        # Stop fitting the rest if the client went away
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,135 @@
+"""
+In-process caching primitives shared by the data and indicator services.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe mapping with per-entry expiry and LRU eviction.
+
+    Args:
+        maxsize (int): Maximum number of entries kept.
+        ttl (float): Seconds an entry stays valid; ``None`` disables expiry.
+    """
+
+    def __init__(self, maxsize=256, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at >= self.ttl
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` and mark it recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if not self._expired(stored_at, time.monotonic()):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """Store ``value`` under ``key``, evicting the least recently used entry."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def find(self, predicate):
+        """
+        Return the first live ``(key, value)`` whose key satisfies ``predicate``.
+
+        Counts as a hit when something is found and a miss otherwise.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for key in reversed(self._data):
+                value, stored_at = self._data[key]
+                if self._expired(stored_at, now) or not predicate(key):
+                    continue
+                self._data.move_to_end(key)
+                self.hits += 1
+                return key, value
+            self.misses += 1
+            return None
+
+    def discard(self, predicate):
+        """Drop every entry whose key satisfies ``predicate``."""
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` once per in-flight ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = {'event': threading.Event(), 'result': None, 'error': None}
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call['event'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = fn(*args, **kwargs)
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['event'].set()
@@ -1,224 +1,490 @@
 """
 Service for fetching stock data from different sources.
 """
-import yfinance as yf
 import pandas as pd
-import numpy as np
+from contextlib import ExitStack
 from datetime import datetime, timedelta
+from django.conf import settings
 
+from .cache import SingleFlight, TTLCache
+from .history_store import (get_history_store, normalize_ohlcv, slice_window,
+                            split_download)
+from .providers import get_market_data_provider
+from .sample_data import generate_sample_stock_data
 
-def get_stock_data(symbol, timeframe='1y'):
+# Recently served history windows, sliced to answer contained windows
+_history_cache = TTLCache(maxsize=settings.STOCK_DATA_CACHE_SIZE,
+                          ttl=settings.STOCK_DATA_CACHE_TTL)
+_history_flight = SingleFlight()
+
+
+def normalize_symbol(symbol):
     """
-    Fetch stock data for a given symbol and timeframe.
-    
+    Append the default exchange suffix to a bare symbol.
+
     Args:
-        symbol (str): Stock symbol (will append .NS for NSE or .BO for BSE if needed).
-        timeframe (str): Time period to fetch data for (e.g., '1d', '1w', '1m', '1y').
-    
+        symbol (str): Stock symbol, with or without a ``.NS``/``.BO`` suffix.
+
     Returns:
-        pandas.DataFrame: DataFrame containing stock data.
+        str: Symbol with an exchange suffix (NSE if none was given).
     """
-    # Process symbol to handle NSE/BSE stocks
     if not (symbol.endswith('.NS') or symbol.endswith('.BO')):
         # Default to NSE if no exchange specified
         symbol = f"{symbol}.NS"
+    return symbol
 
-    # Calculate start and end dates based on timeframe
-    end_date = datetime.now()
 
+def timeframe_start(timeframe, end_date):
+    """
+    Translate a relative timeframe string into a start date.
+
+    Args:
+        timeframe (str): Time period (e.g., '5d', '2w', '6m', '1y').
+        end_date (datetime): End of the window.
+
+    Returns:
+        datetime: Start of the window.
+    """
     if timeframe.endswith('d'):
         days = int(timeframe[:-1])
-        start_date = end_date - timedelta(days=days)
+        return end_date - timedelta(days=days)
     elif timeframe.endswith('w'):
         weeks = int(timeframe[:-1])
-        start_date = end_date - timedelta(weeks=weeks)
+        return end_date - timedelta(weeks=weeks)
     elif timeframe.endswith('m'):
         months = int(timeframe[:-1])
-        start_date = end_date - timedelta(days=months * 30)  # Approximate
+        return end_date - timedelta(days=months * 30)  # Approximate
     elif timeframe.endswith('y'):
         years = int(timeframe[:-1])
-        start_date = end_date - timedelta(days=years * 365)  # Approximate
+        return end_date - timedelta(days=years * 365)  # Approximate
+
+    # Default to 1 year if invalid timeframe
+    return end_date - timedelta(days=365)
+
+
+def get_stock_data(symbol, timeframe='1y', start_date=None, end_date=None):
+    """
+    Fetch stock data for a given symbol and timeframe.
+    
+    History is served from the in-process cache when a cached window for the
+    symbol contains the requested one, and otherwise from the local history
+    store; only the bars missing from the store are downloaded.
+
+    Args:
+        symbol (str): Stock symbol (will append .NS for NSE or .BO for BSE if needed).
+        timeframe (str): Time period to fetch data for (e.g., '1d', '1w', '1m', '1y').
+        start_date (date): Exact first day, overriding the timeframe.
+        end_date (date): Exact last day (inclusive); defaults to today.
+    
+    Returns:
+        pandas.DataFrame: DataFrame containing stock data.
+    """
+    return prepare_stock_frame(
+        get_stock_history(symbol, timeframe, start_date, end_date))
+
+
+def get_stock_history(symbol, timeframe='1y', start_date=None, end_date=None):
+    """
+    Return the raw OHLCV bars behind ``get_stock_data``.
+
+    Callers that need the version of a window before deciding whether to
+    build a response (see ``history_version``) fetch the bars with this and
+    pass them to ``prepare_stock_frame`` themselves.
+
+    Args:
+        symbol (str): Stock symbol (NSE is assumed when no suffix is given).
+        timeframe (str): Time period to fetch data for.
+        start_date (date): Exact first day, overriding the timeframe.
+        end_date (date): Exact last day (inclusive); defaults to today.
+
+    Returns:
+        pandas.DataFrame: OHLCV bars indexed by ``Date``.
+    """
+    symbol = normalize_symbol(symbol)
+    start_date, end_date = date_range_window(timeframe, start_date, end_date)
+    return get_cached_history(symbol, start_date, end_date)
+
+
+def date_range_window(timeframe='1y', start_date=None, end_date=None):
+    """
+    Resolve a request's window into the start and end passed to the cache.
+
+    Without explicit dates the window is the ``timeframe`` ending now. An
+    explicit ``end_date`` includes that whole day (capped at now), and a
+    missing ``start_date`` is the ``timeframe`` before the end.
+
+    Returns:
+        tuple: (start datetime, end datetime).
+    """
+    now = datetime.now()
+    if end_date is None:
+        end = now
     else:
-        # Default to 1 year if invalid timeframe
-        start_date = end_date - timedelta(days=365)
+        end = min(datetime.combine(end_date, datetime.max.time()), now)
 
-    # Fetch the data using yfinance
-    try:
-        data = yf.download(symbol, start=start_date, end=end_date)
+    if start_date is None:
+        start = timeframe_start(timeframe, end)
+    else:
+        start = datetime.combine(start_date, datetime.min.time())
 
-        # Check if data is empty
-        if data.empty:
-            print(f"No data available for {symbol}")
-            # Generate synthetic data for demo purposes based on common patterns
-            # This is important since yfinance sometimes has issues with Indian stocks
-            return generate_sample_stock_data(symbol, start_date, end_date)
+    return start, end
 
-        # Calculate returns using appropriate column
-        close_col = f'Close.{symbol}'
-        data['Returns'] = data['Close'].pct_change()
-        data['Cumulative Returns'] = (1 + data['Returns']).cumprod() - 1
 
-        df = data.reset_index()
-        df['Date'] = df['Date'].astype(str)  # Make date serializable
+def history_version(history):
+    """
+    Return a cheap version of a window of bars.
 
-        df.replace([float('inf'), float('-inf')], float('nan'), inplace=True)
-        df.dropna(inplace=True)
+    The latest close is included because the last bar of the day keeps
+    changing until the session closes.
 
-        with open("data.json", "w") as d:
-            d.write(str(df))
+    Returns:
+        tuple: (last bar timestamp or None, row count, last close or None).
+    """
+    if history is None or history.empty:
+        return (None, 0, None)
+    return (history.index[-1], len(history), float(history['Close'].iloc[-1]))
 
-        return df
 
-    except Exception as e:
-        print(f"Error fetching data for {symbol}: {e}")
-        # Generate synthetic data for demo purposes if real data can't be fetched
-        return generate_sample_stock_data(symbol, start_date, end_date)
+def frame_version(data):
+    """
+    Return ``history_version`` for a frame in the ``get_stock_data`` layout.
+
+    Returns:
+        tuple: (last date string or None, row count, last close or None).
+    """
+    if data is None or data.empty:
+        return (None, 0, None)
+    return (str(data['Date'].iloc[-1]), len(data), float(data['Close'].iloc[-1]))
 
 
-def generate_sample_stock_data(symbol, start_date, end_date):
+def get_stock_data_many(symbols, timeframe='1y'):
     """
-    Generate synthetic stock data for demonstration purposes.
-    This function is used when actual data from yfinance is unavailable.
-    
+    Fetch stock data for several symbols with a single upstream download.
+
+    Symbols already held in the cache are served from it; the rest are
+    refreshed together through one multi-ticker download.
+
     Args:
-        symbol (str): Stock symbol
-        start_date (datetime): Start date
-        end_date (datetime): End date
-        
+        symbols (list): Stock symbols (NSE is assumed when no suffix is given).
+        timeframe (str): Time period to fetch data for (e.g., '1m', '1y').
+
     Returns:
-        pandas.DataFrame: DataFrame with synthetic stock data
-    """
-    # Create date range from start to end
-    date_range = pd.date_range(start=start_date, end=end_date,
-                               freq='B')  # 'B' for business days
-
-    # Determine starting price based on company type
-    if 'RELIANCE' in symbol:
-        base_price = 2500
-        volatility = 0.015
-    elif 'TCS' in symbol:
-        base_price = 3400
-        volatility = 0.01
-    elif 'HDFC' in symbol:
-        base_price = 1600
-        volatility = 0.012
-    elif 'INFOSYS' in symbol or 'INFY' in symbol:
-        base_price = 1400
-        volatility = 0.011
-    elif 'POLYCAB' in symbol:
-        base_price = 5800
-        volatility = 0.018
-    else:
-        # Default values for other stocks
-        base_price = 1000
-        volatility = 0.013
+        dict: Requested symbol to DataFrame, in the same layout as
+        ``get_stock_data``.
+    """
+    end_date = datetime.now()
+    start_date = timeframe_start(timeframe, end_date)
+
+    qualified = {symbol: normalize_symbol(symbol) for symbol in symbols}
+    histories = {}
+    missing = []
+
+    for symbol in dict.fromkeys(qualified.values()):
+        history = _cached_window(stock_data_cache_key(symbol, start_date, end_date))
+        if history is not None:
+            histories[symbol] = history
+        else:
+            missing.append(symbol)
+
+    if missing:
+        refreshed = refresh_history_many(missing, start_date, end_date)
+        for symbol in missing:
+            history = _with_fallback(symbol, refreshed[symbol], start_date,
+                                     end_date)
+            _history_cache.set(stock_data_cache_key(symbol, start_date, end_date),
+                               history)
+            histories[symbol] = history
+
+    return {
+        symbol: prepare_stock_frame(histories[qualified[symbol]])
+        for symbol in symbols
+    }
 
-    # Generate prices with random walk, ensuring non-negative values
-    np.random.seed(hash(symbol) %
-                   10000)  # Seed based on symbol for consistent results
 
-    # Generate random price changes with mean slightly positive for upward trend
-    price_changes = np.random.normal(0.0003, volatility, len(date_range))
+def stock_data_cache_key(symbol, start_date, end_date):
+    """
+    Build the cache key for a window, normalized to whole trading days.
 
-    # Calculate cumulative price changes
-    cum_changes = np.cumprod(1 + price_changes)
+    Returns:
+        tuple: ``(symbol, start_day, end_day)`` as ``pandas.Timestamp`` days.
+    """
+    return (symbol, pd.Timestamp(start_date).normalize(),
+            pd.Timestamp(end_date).normalize())
 
-    # Generate price series
-    prices = base_price * cum_changes
 
-    # Create DataFrame
-    data = pd.DataFrame(
-        {
-            'Open': prices * np.random.uniform(0.995, 1.0, len(date_range)),
-            'High': prices * np.random.uniform(1.001, 1.02, len(date_range)),
-            'Low': prices * np.random.uniform(0.98, 0.999, len(date_range)),
-            'Close': prices,
-            'Adj Close': prices,
-            'Volume': np.random.randint(100000, 1000000, size=len(date_range))
-        },
-        index=date_range)
+def get_cached_history(symbol, start_date, end_date):
+    """
+    Return OHLCV bars for a window, reusing any cached window that contains it.
 
-    # Ensure High > Open, Close, Low and Low < Open, Close, High
-    for idx in data.index:
-        data.loc[idx, 'High'] = max(data.loc[idx, 'Open'],
-                                    data.loc[idx, 'Close'], data.loc[idx,
-                                                                     'High'])
-        data.loc[idx, 'Low'] = min(data.loc[idx, 'Open'],
-                                   data.loc[idx, 'Close'], data.loc[idx,
-                                                                    'Low'])
+    A cached '2y' window also answers '1y' or '6m' requests for the same
+    symbol by slicing. Concurrent misses for the same window share a single
+    upstream fetch.
 
-    # Calculate daily returns
-    data['Returns'] = data['Adj Close'].pct_change()
+    Args:
+        symbol (str): Exchange-qualified stock symbol.
+        start_date (datetime): Start of the requested window.
+        end_date (datetime): End of the requested window.
 
-    # Calculate cumulative returns
-    data['Cumulative Returns'] = (1 + data['Returns'].fillna(0)).cumprod() - 1
+    Returns:
+        pandas.DataFrame: OHLCV bars indexed by ``Date``.
+    """
+    key = stock_data_cache_key(symbol, start_date, end_date)
+
+    history = _cached_window(key)
+    if history is not None:
+        return history
+
+    history = _history_flight.do(key, _load_history, symbol, start_date, end_date)
+    _history_cache.set(key, history)
+    return history
+
+
+def _cached_window(key):
+    """Slice the requested window out of any cached window containing it."""
+    symbol, start, end = key
+    found = _history_cache.find(
+        lambda cached: cached[0] == symbol and cached[1] <= start and cached[2] >= end)
+    if found is None:
+        return None
+    return slice_window(found[1], start, end)
+
+
+def _load_history(symbol, start_date, end_date):
+    """Load a window through the history store, falling back to synthetic data."""
+    history = refresh_history(symbol, start_date, end_date)
+    return _with_fallback(symbol, history, start_date, end_date)
+
+
+def _with_fallback(symbol, history, start_date, end_date):
+    """Substitute synthetic bars when no real history could be obtained."""
+    if history is None or history.empty:
+        print(f"No data available for {symbol}")
+        # Generate synthetic data for demo purposes based on common patterns
+        # This is important since yfinance sometimes has issues with Indian stocks
+        history = normalize_ohlcv(
+            generate_sample_stock_data(symbol, start_date, end_date))
+
+    return history
+
+
+def get_stock_data_cache_stats():
+    """
+    Return hit/miss counters of the stock data cache.
+
+    Returns:
+        dict: Cache counters plus the number of coalesced concurrent fetches.
+    """
+    stats = _history_cache.stats()
+    stats['coalesced'] = _history_flight.coalesced
+    return stats
+
+
+def refresh_history(symbol, start_date, end_date):
+    """
+    Bring the stored history for a symbol up to date and return the window.
+
+    The first request for a symbol (or one reaching further back than the
+    store covers) downloads the whole window. Afterwards only the tail from
+    the last stored bar onwards is downloaded, at most once every
+    ``settings.HISTORY_REFRESH_INTERVAL`` seconds, and appended to the store.
+
+    Args:
+        symbol (str): Exchange-qualified stock symbol.
+        start_date (datetime): Start of the requested window.
+        end_date (datetime): End of the requested window.
+
+    Returns:
+        pandas.DataFrame or None: OHLCV bars within the window, or None if
+        nothing could be fetched or loaded.
+    """
+    return refresh_history_many([symbol], start_date, end_date)[symbol]
+
+
+def refresh_history_many(symbols, start_date, end_date):
+    """
+    Refresh the stored history of several symbols with batched downloads.
+
+    Symbols needing their whole window share one multi-ticker download and
+    symbols needing only their tail share another, so any number of symbols
+    costs at most two upstream calls.
+
+    Args:
+        symbols (list): Exchange-qualified stock symbols.
+        start_date (datetime): Start of the requested window.
+        end_date (datetime): End of the requested window.
+
+    Returns:
+        dict: Symbol to OHLCV bars within the window (None if unavailable).
+    """
+    store = get_history_store()
+    start = pd.Timestamp(start_date).normalize()
+    symbols = list(dict.fromkeys(symbols))
+
+    with ExitStack() as stack:
+        for symbol in sorted(symbols):
+            stack.enter_context(store.lock_for(symbol))
+
+        now = pd.Timestamp.now()
+        full, tails = _plan_refresh(store, symbols, start, end_date, now)
 
-    return data
+        # Downloads always run up to now, even for a window ending in the
+        # past, so the stored bars stay contiguous from covered_from onwards
+        if full:
+            _download_into_store(store, full, start_date, now.to_pydatetime(),
+                                 covered_from=start, checked_at=now)
+        if tails:
+            # Re-fetch from the last stored bar so a partial bar gets corrected
+            tail_start = min(tails.values()).to_pydatetime()
+            _download_into_store(store, list(tails), tail_start,
+                                 now.to_pydatetime(), checked_at=now)
 
+        return {symbol: store.read(symbol, start, end_date) for symbol in symbols}
 
-def get_nse_indices():
+
+def _plan_refresh(store, symbols, start, end, now):
+    """
+    Decide which symbols need a full download and which only their tail.
+
+    A window ending before the last stored bar is already complete, so it
+    never triggers a tail refresh.
+
+    Returns:
+        tuple: (symbols needing the whole window, dict of symbol to last
+        stored bar for symbols whose tail is due for a refresh).
+    """
+    refresh_interval = pd.Timedelta(seconds=settings.HISTORY_REFRESH_INTERVAL)
+    full = []
+    tails = {}
+
+    for symbol in symbols:
+        meta = store.read_meta(symbol)
+        if meta is None or meta['last_bar'] is None or start < meta['covered_from']:
+            # Nothing held for this window yet: download it in full
+            full.append(symbol)
+        elif (pd.Timestamp(end).normalize() >= meta['last_bar']
+              and now - meta['checked_at'] >= refresh_interval):
+            tails[symbol] = meta['last_bar']
+
+    return full, tails
+
+
+def _download_into_store(store, symbols, start_date, end_date, covered_from=None,
+                         checked_at=None):
+    """Download ``symbols`` in one call and append each one's bars to the store."""
+    # Outside the try: a misconfigured provider must fail loudly
+    provider = get_market_data_provider()
+    try:
+        data = provider.download(symbols, start=start_date, end=end_date)
+    except Exception as e:
+        print(f"Error fetching data for {', '.join(symbols)}: {e}")
+        return
+
+    updated = []
+    for symbol, bars in split_download(data, symbols).items():
+        if bars.empty and covered_from is not None:
+            # Leave the symbol unstored so the next request retries it
+            continue
+        before = store.read_meta(symbol)
+        merged = store.append(symbol, bars, covered_from=covered_from,
+                              checked_at=checked_at)
+        # A tail refresh re-downloads the last stored bar; only a new bar
+        # or a new close of that bar is a change
+        if _latest_bar(merged) != (None if before is None else
+                                   (before['last_bar'], before['last_close'])):
+            updated.append(symbol)
+
+    if updated:
+        # Imported here: the screener builds on this module
+        from .screener import screener_bars_changed
+        screener_bars_changed(updated)
+
+
+def _latest_bar(history):
+    """Date and close of the last bar, or None without bars."""
+    if history is None or history.empty:
+        return None
+    last_bar, rows, last_close = history_version(history)
+    return (last_bar, last_close)
+
+
+def prepare_stock_frame(history):
+    """
+    Turn stored OHLCV bars into the frame returned by ``get_stock_data``.
+
+    Args:
+        history (pandas.DataFrame): Price data indexed by date.
+
+    Returns:
+        pandas.DataFrame: Flat frame with a string ``Date`` column, OHLCV,
+        ``Returns`` and ``Cumulative Returns``.
+    """
+    data = normalize_ohlcv(history)
+
+    # Calculate daily and cumulative returns
+    data['Returns'] = data['Close'].pct_change()
+    data['Cumulative Returns'] = (1 + data['Returns']).cumprod() - 1
+
+    df = data.reset_index()
+    df['Date'] = df['Date'].astype(str)  # Make date serializable
+
+    df.replace([float('inf'), float('-inf')], float('nan'), inplace=True)
+    df.dropna(inplace=True)
+
+    return df
+
+
+def get_nse_indices(indices=None):
     """
     Fetch the major NSE indices data.
     
+    All indices are fetched with a single batched download.
+
+    Args:
+        indices (dict): Index symbol to display name. Defaults to
+            ``settings.MARKET_INDICES``.
+
     Returns:
         pandas.DataFrame: DataFrame containing NSE indices data.
     """
-    # Major NSE indices
-    indices = [
-        '^NSEI',  # NIFTY 50
-        '^NSEBANK',  # NIFTY BANK
-        '^CNXIT',  # NIFTY IT
-        '^CNXAUTO',  # NIFTY AUTO
-        '^CNXPHARMA'  # NIFTY PHARMA
-    ]
+    if indices is None:
+        indices = settings.MARKET_INDICES
 
-    # Dictionary to map index symbols to their display names
-    index_names = {
-        '^NSEI': 'NIFTY 50',
-        '^NSEBANK': 'NIFTY BANK',
-        '^CNXIT': 'NIFTY IT',
-        '^CNXAUTO': 'NIFTY AUTO',
-        '^CNXPHARMA': 'NIFTY PHARMA'
-    }
+    symbols = list(indices)
+    provider = get_market_data_provider()
+
+    try:
+        # A few days back so holidays still leave two sessions to compare
+        data = provider.download(symbols, period='5d')
+    except Exception as e:
+        print(f"Error fetching data for indices {', '.join(symbols)}: {e}")
+        return pd.DataFrame()
 
     result_data = []
 
-    for index in indices:
-        try:
-            # Fetch the latest data for the index
-            data = yf.download(index, period='2d')
-
-            if not data.empty:
-                latest = data.iloc[-1]
-                previous = data.iloc[-2]
-
-                # Calculate the daily change and percentage
-                change = latest['Close'] - previous['Close']
-                change_percent = (change / previous['Close']) * 100
-
-                result_data.append({
-                    'symbol':
-                    index,
-                    'name':
-                    index_names.get(index, index),
-                    'price':
-                    round(latest['Close'], 2),
-                    'change':
-                    round(change, 2),
-                    'change_percent':
-                    round(change_percent, 2),
-                    'volume':
-                    int(latest['Volume']) if 'Volume' in latest else 0,
-                    'high':
-                    round(latest['High'], 2),
-                    'low':
-                    round(latest['Low'], 2)
-                })
-
-        except Exception as e:
-            print(f"Error fetching data for index {index}: {e}")
+    for index, bars in split_download(data, symbols).items():
+        bars = bars.dropna(subset=['Close'])
+        if len(bars) < 2:
+            print(f"Not enough data for index {index}")
             continue
 
+        latest = bars.iloc[-1]
+        previous = bars.iloc[-2]
+
+        # Calculate the daily change and percentage
+        change = latest['Close'] - previous['Close']
+        change_percent = (change / previous['Close']) * 100
+
+        result_data.append({
+            'symbol': index,
+            'name': indices.get(index, index),
+            'price': round(latest['Close'], 2),
+            'change': round(change, 2),
+            'change_percent': round(change_percent, 2),
+            'volume': 0 if pd.isna(latest['Volume']) else int(latest['Volume']),
+            'high': round(latest['High'], 2),
+            'low': round(latest['Low'], 2)
+        })
+
     return pd.DataFrame(result_data)
 
 
@@ -613,28 +879,21 @@ def get_popular_indian_stocks():
     return popular_stocks
 
 
-def search_indian_stocks(query):
+def search_indian_stocks(query, limit=10):
     """
     Search for Indian stocks by name or symbol.
     
     Args:
         query (str): Search query string.
+        limit (int): Maximum number of matches.
     
     Returns:
-        list: List of matching stock dictionaries.
+        list: List of matching stock dictionaries, best match first.
     """
-    stocks = get_popular_indian_stocks()
-
     if not query:
-        return stocks[:10]  # Return first 10 stocks if no query
+        return get_popular_indian_stocks()[:limit]  # Popular stocks if no query
 
-    # Convert query to lowercase for case-insensitive matching
-    query = query.lower()
-
-    # Filter stocks that match the query
-    matching_stocks = [
-        stock for stock in stocks
-        if query in stock['symbol'].lower() or query in stock['name'].lower()
-    ]
+    # Imported here as the index falls back to the popular stocks above
+    from .symbol_search import search_symbols
 
-    return matching_stocks[:10]  # Limit to top 10 matches
+    return search_symbols(query, limit)
@@ -0,0 +1,157 @@
+"""
+Downsampling of long price series for charts.
+
+A chart is at most about a thousand pixels wide, so sending every daily bar
+of a long history only costs bandwidth and serialization time. These
+helpers pick which rows to keep; the rows themselves are sent unchanged, so
+dates and values stay exact and indicator series sliced with the same rows
+stay aligned with the price series.
+
+Two methods are available:
+
+- ``lttb`` (Largest-Triangle-Three-Buckets) keeps, per bucket, the close
+  forming the largest triangle with its neighbours, which preserves the
+  visual shape of the line.
+- ``minmax`` keeps, per bucket, the rows holding the highest high and the
+  lowest low, so every price extreme survives.
+"""
+import numpy as np
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+# Fewest points a series can be reduced to (first, last and one bucket)
+MIN_POINTS = 4
+
+
+def parse_downsample_options(params):
+    """
+    Read ``points`` and ``downsample`` from request parameters.
+
+    Args:
+        params (dict): Query parameters or validated request data.
+
+    Returns:
+        tuple: (points or None, method).
+
+    Raises:
+        ValueError: If either option is invalid.
+    """
+    method = params.get('downsample') or 'lttb'
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(
+            f"Unknown downsample method: {method}. "
+            f"Use one of: {', '.join(DOWNSAMPLE_METHODS)}")
+
+    points = params.get('points')
+    if points in (None, ''):
+        return None, method
+    try:
+        points = int(points)
+    except (TypeError, ValueError):
+        raise ValueError("points must be an integer")
+    if points < MIN_POINTS:
+        raise ValueError(f"points must be at least {MIN_POINTS}")
+    return points, method
+
+
+def lttb_indices(values, points):
+    """
+    Select rows with Largest-Triangle-Three-Buckets.
+
+    The first and last rows are always kept; the rows in between are split
+    into ``points - 2`` buckets and each bucket contributes the row forming
+    the largest triangle with the row kept from the previous bucket and the
+    average of the next bucket. Bucket averages come from one prefix sum
+    and each bucket's triangle areas are computed as one array operation;
+    only the walk from bucket to bucket is sequential.
+
+    Args:
+        values (array-like): Finite values, one per row (x is the row
+            position, as bars are evenly spaced on a chart).
+        points (int): Number of rows to keep.
+
+    Returns:
+        numpy.ndarray: Sorted row positions.
+    """
+    y = np.asarray(values, dtype='float64')
+    n = len(y)
+    if points >= n:
+        return np.arange(n)
+
+    # Bucket edges over the interior rows 1 .. n-2
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    sums = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = edges[1:] - edges[:-1]
+    mean_y = (sums[edges[1:]] - sums[edges[:-1]]) / sizes
+    mean_x = (edges[1:] + edges[:-1] - 1) / 2
+
+    # The anchor to the right of each bucket: the next bucket's average, or
+    # the last row for the last bucket
+    next_x = np.append(mean_x[1:], n - 1)
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        x = np.arange(lo, hi)
+        area = np.abs((previous - next_x[bucket]) * (y[lo:hi] - y[previous])
+                      - (previous - x) * (next_y[bucket] - y[previous]))
+        previous = lo + int(np.argmax(area))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def minmax_indices(high, low, points):
+    """
+    Select the rows holding each bucket's highest high and lowest low.
+
+    The first and last rows are always kept, and the rows are split into
+    ``(points - 2) // 2`` buckets, so at most ``points`` rows are returned.
+
+    Args:
+        high (array-like): Values whose maxima must be kept.
+        low (array-like): Values whose minima must be kept.
+        points (int): Maximum number of rows to keep.
+
+    Returns:
+        numpy.ndarray: Sorted row positions.
+    """
+    high = np.asarray(high, dtype='float64')
+    low = np.asarray(low, dtype='float64')
+    n = len(high)
+    if points >= n:
+        return np.arange(n)
+
+    buckets = max((points - 2) // 2, 1)
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+
+    # Sorting by bucket first keeps each bucket at positions edges[b]:edges[b+1],
+    # so the first entry of each bucket is its extreme
+    highest = np.lexsort((-high, bucket))[edges[:-1]]
+    lowest = np.lexsort((low, bucket))[edges[:-1]]
+
+    return np.unique(np.concatenate(([0, n - 1], highest, lowest)))
+
+
+def downsample_rows(data, points, method='lttb'):
+    """
+    Select the rows of a ``get_stock_data`` frame to keep for a chart.
+
+    Args:
+        data (pandas.DataFrame): Frame with 'Close', 'High' and 'Low'.
+        points (int): Number of rows to keep.
+        method (str): 'lttb' (shape of the close) or 'minmax' (extremes of
+            high and low).
+
+    Returns:
+        numpy.ndarray: Sorted row positions, for use with ``iloc``.
+    """
+    if method == 'minmax':
+        return minmax_indices(data['High'].to_numpy(), data['Low'].to_numpy(),
+                              points)
+    return lttb_indices(data['Close'].to_numpy(), points)
@@ -0,0 +1,97 @@
+"""
+Local on-disk store for precomputed forecasts.
+
+Each (symbol, model type) pair keeps its latest forecast in a ``.npz`` file,
+together with the version of the bars the model was trained on. A stored
+forecast covers the longest horizon; shorter requests are served by taking
+its first days.
+"""
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+
+class ForecastStore:
+    """
+    Directory of precomputed forecasts, one file per symbol and model type.
+
+    Args:
+        root (str or Path): Directory holding the ``.npz`` files.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path_for(self, symbol, model_type):
+        """File holding the forecast of ``model_type`` for ``symbol``."""
+        return self.root / f"{symbol.replace('/', '_')}-{model_type}.npz"
+
+    def read(self, symbol, model_type, version, days=None):
+        """
+        Load a stored forecast if it was made from the given data version.
+
+        Args:
+            symbol (str): Exchange-qualified stock symbol.
+            model_type (str): Model type.
+            version (tuple): ``data_version`` of the current bars.
+            days (int): Number of days needed; None for the whole forecast.
+
+        Returns:
+            pandas.DataFrame or None: 'Date' and 'Predicted_Price' columns, or
+            None if nothing current covering ``days`` is stored.
+        """
+        path = self.path_for(symbol, model_type)
+        if not path.exists():
+            return None
+        last_bar, last_close = version
+        with np.load(path) as archive:
+            if ('last_close' not in archive
+                    or str(archive['last_bar']) != str(last_bar)
+                    or float(archive['last_close']) != last_close):
+                return None
+            dates = archive['Date']
+            prices = archive['Predicted_Price']
+        if days is not None:
+            if len(dates) < days:
+                return None
+            dates, prices = dates[:days], prices[:days]
+        return pd.DataFrame({'Date': pd.DatetimeIndex(dates),
+                             'Predicted_Price': prices})
+
+    def write(self, symbol, model_type, version, forecast):
+        """Atomically replace the stored forecast of ``model_type`` for ``symbol``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        last_bar, last_close = version
+        arrays = {
+            'Date': pd.DatetimeIndex(forecast['Date']).to_numpy(dtype='datetime64[ns]'),
+            'Predicted_Price': forecast['Predicted_Price'].to_numpy(dtype='float64'),
+            'last_bar': np.array(str(last_bar)),
+            'last_close': np.array(last_close, dtype='float64'),
+        }
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                np.savez(handle, **arrays)
+            os.replace(tmp_path, self.path_for(symbol, model_type))
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+
+_default_store = None
+_default_store_guard = threading.Lock()
+
+
+def get_forecast_store():
+    """Return the process-wide store rooted at ``settings.FORECAST_STORE_DIR``."""
+    global _default_store
+    with _default_store_guard:
+        if _default_store is None:
+            _default_store = ForecastStore(settings.FORECAST_STORE_DIR)
+        return _default_store
@@ -0,0 +1,254 @@
+"""
+Local on-disk store for daily OHLCV history.
+
+Each symbol is kept in its own columnar ``.npz`` file (one NumPy array per
+column plus a few metadata scalars), so a refresh only needs to download the
+bars after the last one we already hold and append them.
+"""
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+# Columns persisted for every symbol, in storage order
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def normalize_ohlcv(data):
+    """
+    Bring a yfinance (or synthetic) frame into the canonical storage layout.
+
+    yfinance returns ``(Price, Ticker)`` MultiIndex columns even for a single
+    ticker; those are flattened to the price level. The result is indexed by
+    a naive ``DatetimeIndex`` named ``Date`` and holds only OHLCV columns.
+
+    Args:
+        data (pandas.DataFrame): Raw price data indexed by date.
+
+    Returns:
+        pandas.DataFrame: Sorted, de-duplicated OHLCV frame.
+    """
+    if data is None or data.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS,
+                            index=pd.DatetimeIndex([], name='Date'),
+                            dtype='float64')
+
+    frame = data.copy()
+    if isinstance(frame.columns, pd.MultiIndex):
+        frame.columns = frame.columns.get_level_values(0)
+
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame.index = index.normalize()
+    frame.index.name = 'Date'
+
+    for column in OHLCV_COLUMNS:
+        if column not in frame.columns:
+            frame[column] = np.nan
+    frame = frame[OHLCV_COLUMNS].astype('float64')
+
+    frame = frame[~frame.index.duplicated(keep='last')]
+    return frame.sort_index()
+
+
+def split_download(data, symbols):
+    """
+    Split a multi-ticker yfinance frame into one OHLCV frame per symbol.
+
+    Args:
+        data (pandas.DataFrame): Result of ``yf.download`` for ``symbols``.
+        symbols (list): Tickers that were requested.
+
+    Returns:
+        dict: Symbol to normalized OHLCV frame (empty if it had no bars).
+    """
+    frames = {}
+
+    for symbol in symbols:
+        bars = None
+        if data is not None and not data.empty:
+            if isinstance(data.columns, pd.MultiIndex):
+                for level in range(data.columns.nlevels):
+                    if symbol in data.columns.get_level_values(level):
+                        bars = data.xs(symbol, axis=1, level=level)
+                        break
+            elif len(symbols) == 1:
+                bars = data
+
+        if bars is not None:
+            # Tickers with different trading calendars leave all-NaN rows
+            bars = bars.dropna(how='all')
+        frames[symbol] = normalize_ohlcv(bars)
+
+    return frames
+
+
+def window_bounds(dates, start=None, end=None):
+    """
+    Positions of the first and past-the-last bar within ``[start, end]``.
+
+    Args:
+        dates (numpy.ndarray): Sorted ``datetime64[ns]`` bar dates.
+        start: Inclusive lower bound, or None for the first bar.
+        end: Inclusive upper bound, or None for the last bar.
+
+    Returns:
+        tuple: (lo, hi) for slicing, found by binary search.
+    """
+    lo = 0
+    hi = len(dates)
+    if start is not None:
+        lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(start), 'ns'),
+                             side='left')
+    if end is not None:
+        hi = np.searchsorted(dates, np.datetime64(pd.Timestamp(end), 'ns'),
+                             side='right')
+    return lo, hi
+
+
+def slice_window(history, start=None, end=None):
+    """
+    Slice an OHLCV frame indexed by sorted dates to ``[start, end]``.
+
+    Returns:
+        pandas.DataFrame: The bars within the window (a view, not a copy).
+    """
+    lo, hi = window_bounds(history.index.to_numpy(dtype='datetime64[ns]'),
+                           start, end)
+    return history.iloc[lo:hi]
+
+
+class HistoryStore:
+    """
+    Columnar per-symbol history files with incremental append.
+
+    Besides the bars, each file records ``covered_from`` (the earliest date a
+    download has covered, which may precede the first bar because of
+    holidays) and ``checked_at`` (when the tail was last fetched), so callers
+    can tell whether a window is already held and whether the tail is fresh.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def lock_for(self, symbol):
+        """Return the per-symbol lock used to serialize refreshes."""
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def path_for(self, symbol):
+        """Return the file path holding history for ``symbol``."""
+        safe_name = symbol.replace('/', '_').replace('^', '_')
+        return self.root / f"{safe_name}.npz"
+
+    def read_meta(self, symbol):
+        """
+        Read only the metadata of a symbol's file.
+
+        Returns:
+            dict or None: ``first_bar``, ``last_bar``, ``covered_from``,
+            ``checked_at`` (all ``pandas.Timestamp``), ``last_close`` and
+            ``rows``, or None when nothing is stored.
+        """
+        path = self.path_for(symbol)
+        if not path.exists():
+            return None
+        with np.load(path) as archive:
+            dates = archive['Date']
+            return {
+                'first_bar': pd.Timestamp(dates[0]) if len(dates) else None,
+                'last_bar': pd.Timestamp(dates[-1]) if len(dates) else None,
+                'covered_from': pd.Timestamp(archive['covered_from'][()]),
+                'checked_at': pd.Timestamp(archive['checked_at'][()]),
+                'last_close': (float(archive['Close'][-1]) if len(dates)
+                               else None),
+                'rows': len(dates),
+            }
+
+    def read(self, symbol, start=None, end=None):
+        """
+        Load stored bars for a symbol, optionally limited to ``[start, end]``.
+
+        Returns:
+            pandas.DataFrame or None: OHLCV frame indexed by ``Date``.
+        """
+        path = self.path_for(symbol)
+        if not path.exists():
+            return None
+        with np.load(path) as archive:
+            dates = archive['Date']
+            lo, hi = window_bounds(dates, start, end)
+            columns = {column: archive[column][lo:hi] for column in OHLCV_COLUMNS}
+            index = pd.DatetimeIndex(dates[lo:hi], name='Date')
+        return pd.DataFrame(columns, index=index)
+
+    def write(self, symbol, frame, covered_from, checked_at):
+        """Atomically replace a symbol's file with ``frame`` and metadata."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            column: np.ascontiguousarray(frame[column].to_numpy(dtype='float64'))
+            for column in OHLCV_COLUMNS
+        }
+        arrays['Date'] = frame.index.to_numpy(dtype='datetime64[ns]')
+        arrays['covered_from'] = np.datetime64(pd.Timestamp(covered_from), 'ns')
+        arrays['checked_at'] = np.datetime64(pd.Timestamp(checked_at), 'ns')
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                np.savez(handle, **arrays)
+            os.replace(tmp_path, self.path_for(symbol))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def append(self, symbol, new_bars, covered_from=None, checked_at=None):
+        """
+        Merge ``new_bars`` into the stored history and persist the result.
+
+        Bars already held for the same date are replaced by the new values,
+        so re-fetching the current (still forming) bar corrects it in place.
+
+        Returns:
+            pandas.DataFrame: The full merged history.
+        """
+        new_bars = normalize_ohlcv(new_bars)
+        meta = self.read_meta(symbol)
+        existing = self.read(symbol)
+
+        if existing is not None and not existing.empty:
+            merged = pd.concat([existing, new_bars])
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        else:
+            merged = new_bars
+
+        if covered_from is None:
+            covered_from = merged.index[0] if len(merged) else pd.Timestamp.now()
+        if meta is not None:
+            covered_from = min(pd.Timestamp(covered_from), meta['covered_from'])
+        if checked_at is None:
+            checked_at = pd.Timestamp.now()
+
+        self.write(symbol, merged, covered_from, checked_at)
+        return merged
+
+
+_default_store = None
+_default_store_guard = threading.Lock()
+
+
+def get_history_store():
+    """Return the process-wide store rooted at ``settings.HISTORY_STORE_DIR``."""
+    global _default_store
+    with _default_store_guard:
+        if _default_store is None:
+            _default_store = HistoryStore(settings.HISTORY_STORE_DIR)
+        return _default_store
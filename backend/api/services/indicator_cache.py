@@ -0,0 +1,113 @@
+"""
+Memoization of indicator results keyed by the version of the underlying bars.
+
+Entries are keyed on the window's ``frame_version`` - its last bar
+timestamp, number of rows and last close - so an entry stays valid exactly
+as long as the bars it was computed from, including the close of a bar that
+is still trading. When a newer bar or a new close of the latest bar shows
+up for a symbol, every entry computed from the older bars is dropped.
+"""
+import threading
+
+from django.conf import settings
+
+from .cache import TTLCache
+from .data_service import frame_version, normalize_symbol
+from .technical_indicators import IndicatorEngine, resolve_indicator_requests
+
+_indicator_cache = TTLCache(maxsize=settings.INDICATOR_CACHE_SIZE, ttl=None)
+_latest_bars = {}
+_latest_bars_lock = threading.Lock()
+
+
+def data_version(data):
+    """
+    Return the version of the latest bars of a price window.
+
+    Used for fitted models and forecasts, which only depend on the latest
+    bars. The row count is left out: a rolling window such as '2y' loses its
+    oldest bar as the calendar moves on, which must not invalidate a fit
+    made from the same latest bar.
+
+    Returns:
+        tuple: (last bar timestamp, last close).
+    """
+    if data is None or data.empty:
+        return (None, None)
+    return (str(data['Date'].iloc[-1]), float(data['Close'].iloc[-1]))
+
+
+def _invalidate_older(symbol, last_bar, last_close):
+    """Drop entries computed from older bars or an earlier close of ``last_bar``."""
+    with _latest_bars_lock:
+        known = _latest_bars.get(symbol)
+        if known is not None and (known[0] > last_bar
+                                  or known == (last_bar, last_close)):
+            return
+        _latest_bars[symbol] = (last_bar, last_close)
+
+    if known is not None:
+        _indicator_cache.discard(
+            lambda key: key[0] == symbol and (
+                key[1] < last_bar
+                or (key[1] == last_bar and key[3] != last_close)))
+
+
+def get_cached_indicators(symbol, data, indicators=None, parameters=None):
+    """
+    Calculate technical indicators, reusing results for unchanged bars.
+
+    Each (indicator, parameter set) is cached separately, so requests that
+    overlap only partially still share the overlapping results.
+
+    Args:
+        symbol (str): Stock symbol the data belongs to.
+        data (pandas.DataFrame): Price window as returned by ``get_stock_data``.
+        indicators (list): Indicator families to calculate.
+        parameters (dict): Optional parameter sets per family, see
+            ``resolve_indicator_requests``.
+
+    Returns:
+        dict: Indicator name to pandas.Series, plus the ``Date`` column,
+        as ``calculate_technical_indicators`` returns. The Series are shared
+        between callers and must not be modified.
+    """
+    if indicators is None:
+        indicators = ['sma', 'ema', 'rsi', 'macd', 'bollinger_bands']
+
+    symbol = normalize_symbol(symbol)
+    # Today's bar changes all session, so its close is part of the version
+    last_bar, rows, last_close = frame_version(data)
+    if last_bar is not None:
+        _invalidate_older(symbol, last_bar, last_close)
+
+    result = {}
+    engine = None
+
+    for family, params in resolve_indicator_requests(indicators, parameters):
+        key = (symbol, last_bar, rows, last_close, family, params)
+        values = _indicator_cache.get(key) if last_bar is not None else None
+        if values is None:
+            if engine is None:
+                engine = IndicatorEngine(data)
+            values = engine.compute_request(family, dict(params))
+            # Windows without bars have no version to be found again by
+            if last_bar is not None:
+                _indicator_cache.set(key, values)
+
+        result.update(values)
+        result['Date'] = data['Date']
+
+    return result
+
+
+def get_indicator_cache_stats():
+    """Return hit/miss counters of the indicator cache."""
+    return _indicator_cache.stats()
+
+
+def clear_indicator_cache():
+    """Drop every cached indicator result."""
+    _indicator_cache.clear()
+    with _latest_bars_lock:
+        _latest_bars.clear()
@@ -0,0 +1,118 @@
+"""
+Stale-while-revalidate snapshot of the market overview.
+
+The overview is served from the latest snapshot immediately. When the
+snapshot is older than ``settings.MARKET_SNAPSHOT_TTL`` a single background
+thread refreshes it, so no request waits on the index download except the
+very first one.
+"""
+import threading
+from datetime import datetime
+
+from django.conf import settings
+
+from .data_service import get_nse_indices
+
+
+class MarketSnapshot:
+    """
+    Holds the latest result of ``fetch`` and refreshes it in the background.
+
+    Used for the market overview and for the screener index.
+
+    Args:
+        fetch (callable): Returns the snapshot data (a DataFrame or any
+            other object with a length); empty results are not kept.
+        ttl (float): Seconds after which the snapshot counts as stale.
+    """
+
+    def __init__(self, fetch, ttl):
+        self.fetch = fetch
+        self.ttl = ttl
+        self._data = None
+        self._taken_at = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        # Invalidations so far, and how many of them the snapshot reflects
+        self._invalidations = 0
+        self._seen_invalidations = 0
+        self._cold_start_lock = threading.Lock()
+
+    def is_stale(self):
+        """
+        Return True when there is no snapshot, it has outlived the TTL or
+        its source data changed since it was taken.
+        """
+        if (self._taken_at is None
+                or self._invalidations != self._seen_invalidations):
+            return True
+        return (datetime.now() - self._taken_at).total_seconds() >= self.ttl
+
+    def refresh(self):
+        """Fetch a new snapshot synchronously and keep it if non-empty."""
+        # Invalidations arriving during the fetch leave the snapshot stale
+        with self._lock:
+            invalidations = self._invalidations
+        try:
+            data = self.fetch()
+            if data is not None and len(data):
+                with self._lock:
+                    self._data = data
+                    self._taken_at = datetime.now()
+                    self._seen_invalidations = invalidations
+        except Exception as e:
+            print(f"Error refreshing market snapshot: {e}")
+
+    def invalidate(self):
+        """Mark the snapshot stale so the next ``get`` refreshes it."""
+        with self._lock:
+            self._invalidations += 1
+
+    def refresh_async(self):
+        """Start a background refresh unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name='market-snapshot', daemon=True).start()
+
+    def get(self):
+        """
+        Return the latest snapshot, refreshing it as needed.
+
+        Returns:
+            tuple: (pandas.DataFrame or None, datetime or None) - the index
+            quotes and the time they were taken.
+        """
+        if self._data is None:
+            # Nothing to serve yet: the first callers wait for a single fetch
+            with self._cold_start_lock:
+                if self._data is None:
+                    self.refresh()
+        elif self.is_stale():
+            self.refresh_async()
+
+        with self._lock:
+            return self._data, self._taken_at
+
+
+_market_snapshot = MarketSnapshot(get_nse_indices, settings.MARKET_SNAPSHOT_TTL)
+
+
+def get_market_snapshot():
+    """
+    Return the latest market overview snapshot.
+
+    Returns:
+        tuple: (pandas.DataFrame or None, datetime or None) - the index
+        quotes and the time they were taken.
+    """
+    return _market_snapshot.get()
@@ -0,0 +1,161 @@
+"""
+Registry of fitted prediction models.
+
+A fitted model is identified by its spec - symbol, model type, feature set
+and hyperparameters - and by the version of the data it was trained on (last
+bar and its close). Each spec keeps one artifact on disk holding the latest
+fit; it is reused until new bars arrive, at which point it is refitted and
+replaced. Recently used models also stay loaded in memory, up to
+``settings.MODEL_REGISTRY_SIZE`` of them.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from .cache import SingleFlight, TTLCache
+from .prediction_service import fit_model
+
+
+def model_spec(symbol, model_type, features=None, params=None):
+    """
+    Build the hashable spec identifying a model independently of its data.
+
+    Returns:
+        tuple: (symbol, model_type, sorted features, params as canonical
+        JSON).
+    """
+    return (
+        symbol,
+        model_type,
+        tuple(sorted(features)) if features else (),
+        json.dumps(params or {}, sort_keys=True),
+    )
+
+
+class ModelRegistry:
+    """
+    Stores fitted models on disk and keeps the recently used ones in memory.
+
+    Args:
+        root (str or Path): Directory holding one pickle per model spec,
+            grouped by symbol.
+        maxsize (int): Number of models kept loaded in memory.
+    """
+
+    def __init__(self, root, maxsize=64):
+        self.root = Path(root)
+        self._loaded = TTLCache(maxsize=maxsize, ttl=None)
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.fits = 0
+        self.loads = 0
+
+    def path_for(self, spec):
+        """Artifact path of a model spec."""
+        symbol, model_type = spec[0], spec[1]
+        digest = hashlib.sha1(repr(spec).encode()).hexdigest()[:16]
+        return self.root / symbol.replace('/', '_') / f'{model_type}-{digest}.pkl'
+
+    def get_or_fit(self, symbol, model_type, data, version, features=None,
+                   params=None, fit=fit_model):
+        """
+        Return a model fitted on ``data``, fitting it only if needed.
+
+        Args:
+            symbol (str): Stock symbol the data belongs to.
+            model_type (str): Model type, see ``prediction_service.MODEL_FITTERS``.
+            data (dict or pandas.DataFrame): Prices with technical indicators.
+            version (tuple): Version of ``data`` (see
+                ``indicator_cache.data_version``).
+            features (list): Feature columns.
+            params (dict): Model hyperparameters.
+            fit (callable): Called as ``fit(model_type, data, features,
+                **params)`` when a fit is needed, e.g. to run it through the
+                prediction executor.
+
+        Returns:
+            object or None: The fitted model, or None if there is not enough
+            data to fit one.
+        """
+        spec = model_spec(symbol, model_type, features, params)
+
+        model = self._loaded.get((spec, version))
+        if model is not None:
+            return model
+
+        # Concurrent requests for the same fit share one load or fit
+        return self._flight.do((spec, version), self._load_or_fit, spec,
+                               version, data, features, params, fit)
+
+    def _load_or_fit(self, spec, version, data, features, params, fit):
+        artifact = self._read(spec)
+        if artifact is not None and artifact['version'] == version:
+            model = artifact['model']
+            with self._lock:
+                self.loads += 1
+        else:
+            model = fit(spec[1], data, features, **(params or {}))
+            with self._lock:
+                self.fits += 1
+            if model is not None:
+                self._write(spec, version, model)
+
+        if model is not None:
+            # Only the latest version of a spec is worth keeping loaded
+            self._loaded.discard(lambda key: key[0] == spec)
+            self._loaded.set((spec, version), model)
+        return model
+
+    def _read(self, spec):
+        path = self.path_for(spec)
+        try:
+            with open(path, 'rb') as handle:
+                return pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading model artifact {path}: {e}")
+            return None
+
+    def _write(self, spec, version, model):
+        """Atomically replace the artifact of ``spec`` with a new fit."""
+        path = self.path_for(spec)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        artifact = {'spec': spec, 'version': version, 'model': model}
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                pickle.dump(artifact, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def stats(self):
+        """Return fit/load counters and the memory residency counters."""
+        stats = self._loaded.stats()
+        with self._lock:
+            stats['fits'] = self.fits
+            stats['loads'] = self.loads
+        return stats
+
+
+_default_registry = None
+_default_registry_guard = threading.Lock()
+
+
+def get_model_registry():
+    """Return the process-wide registry rooted at ``settings.MODEL_REGISTRY_DIR``."""
+    global _default_registry
+    with _default_registry_guard:
+        if _default_registry is None:
+            _default_registry = ModelRegistry(settings.MODEL_REGISTRY_DIR,
+                                              settings.MODEL_REGISTRY_SIZE)
+        return _default_registry
@@ -0,0 +1,383 @@
+"""
+Incremental (online) technical indicators.
+
+Each indicator keeps only the running state it needs (ring buffers, running
+sums, EMA values), so a new bar is folded in with ``update`` in O(1) instead
+of recomputing over the full history. The values produced match the batch
+functions in ``technical_indicators.py`` bar for bar, and every state can be
+serialized to a JSON-compatible dict and restored.
+
+A missing (NaN) close is handled as the batch functions handle it: it stays
+in the rolling windows and makes them NaN until it leaves, counts as no
+change for RSI, and EMAs carry their value across it.
+"""
+import math
+from collections.abc import Mapping
+from functools import cached_property
+
+from .technical_indicators import indicator_columns
+
+NAN = float('nan')
+
+
+def _close_of(bar):
+    """Accept either a bar mapping with a 'Close' key or a plain price."""
+    if isinstance(bar, Mapping):
+        return float(bar['Close'])
+    return float(bar)
+
+
+class _Window:
+    """Fixed-size ring buffer of the most recent values."""
+
+    def __init__(self, size, values=None, position=0):
+        self.size = size
+        self.values = list(values) if values is not None else []
+        self.position = position
+
+    def push(self, value):
+        """Add ``value`` and return the value it evicts (None while filling)."""
+        if len(self.values) < self.size:
+            self.values.append(value)
+            return None
+        evicted = self.values[self.position]
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.size
+        return evicted
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def to_dict(self):
+        return {'values': self.values, 'position': self.position}
+
+
+class OnlineIndicator:
+    """Base class for incremental indicators."""
+
+    name = None
+
+    def params(self):
+        """Return the constructor parameters of this indicator."""
+        raise NotImplementedError
+
+    def state(self):
+        """Return the running state as a JSON-compatible dict."""
+        raise NotImplementedError
+
+    def load_state(self, state):
+        """Restore running state produced by ``state()``."""
+        raise NotImplementedError
+
+    @cached_property
+    def columns(self):
+        """Output column names, as the batch indicators name them."""
+        return indicator_columns(self.name, self.params())
+
+    def _output(self, *values):
+        return dict(zip(self.columns, values))
+
+    def update(self, bar):
+        """
+        Fold in the next bar.
+
+        Args:
+            bar (dict or float): Bar with a 'Close' key, or the close price.
+
+        Returns:
+            dict: Indicator column name to its value at this bar (NaN until
+            enough bars have been seen).
+        """
+        raise NotImplementedError
+
+    def warm_up(self, closes):
+        """Feed historical closes in order and return the last values."""
+        values = {}
+        for close in closes:
+            values = self.update(close)
+        return values
+
+    def to_dict(self):
+        """Serialize the indicator, parameters and state."""
+        return {'type': self.name, 'params': self.params(), 'state': self.state()}
+
+
+class OnlineSMA(OnlineIndicator):
+    """Simple moving average over the last ``window`` closes."""
+
+    name = 'sma'
+
+    def __init__(self, window=20):
+        self.window = window
+        self._buffer = _Window(window)
+        self._sum = 0.0
+        self._missing = 0
+
+    def params(self):
+        return {'window': self.window}
+
+    def state(self):
+        return {'buffer': self._buffer.to_dict(), 'sum': self._sum,
+                'missing': self._missing}
+
+    def load_state(self, state):
+        self._buffer = _Window(self.window, **state['buffer'])
+        self._sum = state['sum']
+        self._missing = state.get('missing', 0)
+
+    def update(self, bar):
+        close = _close_of(bar)
+        evicted = self._buffer.push(close)
+        for value, sign in ((close, 1), (evicted, -1)):
+            if value is None:
+                continue
+            if math.isnan(value):
+                self._missing += sign
+            else:
+                self._sum += sign * value
+
+        if not self._buffer.full or self._missing:
+            return self._output(NAN)
+        return self._output(self._sum / self.window)
+
+
+class OnlineEMA(OnlineIndicator):
+    """Exponential moving average (``adjust=False``), seeded with the first close."""
+
+    name = 'ema'
+
+    def __init__(self, window=20):
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self._value = None
+        self._gap = 0
+
+    def params(self):
+        return {'window': self.window}
+
+    def state(self):
+        return {'value': self._value, 'gap': self._gap}
+
+    def load_state(self, state):
+        self._value = state['value']
+        self._gap = state.get('gap', 0)
+
+    def step(self, value):
+        """
+        Advance the EMA with a raw value and return the new average.
+
+        A NaN value leaves the average unchanged; the next value then
+        weighs in as it would after that many bars, as with pandas.
+        """
+        if math.isnan(value):
+            if self._value is None:
+                return NAN
+            self._gap += 1
+        elif self._value is None:
+            self._value = value
+        elif self._gap:
+            weight = (1 - self.alpha) ** (self._gap + 1)
+            self._value = ((weight * self._value + self.alpha * value)
+                           / (weight + self.alpha))
+            self._gap = 0
+        else:
+            self._value += self.alpha * (value - self._value)
+        return self._value
+
+    def update(self, bar):
+        return self._output(self.step(_close_of(bar)))
+
+
+class OnlineRSI(OnlineIndicator):
+    """RSI from simple rolling means of gains and losses."""
+
+    name = 'rsi'
+
+    def __init__(self, window=14):
+        self.window = window
+        self._gains = _Window(window)
+        self._losses = _Window(window)
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._previous = None
+
+    def params(self):
+        return {'window': self.window}
+
+    def state(self):
+        return {
+            'gains': self._gains.to_dict(),
+            'losses': self._losses.to_dict(),
+            'gain_sum': self._gain_sum,
+            'loss_sum': self._loss_sum,
+            'previous': self._previous,
+        }
+
+    def load_state(self, state):
+        self._gains = _Window(self.window, **state['gains'])
+        self._losses = _Window(self.window, **state['losses'])
+        self._gain_sum = state['gain_sum']
+        self._loss_sum = state['loss_sum']
+        self._previous = state['previous']
+
+    def update(self, bar):
+        close = _close_of(bar)
+        # The first bar has no change, which counts as zero gain and loss,
+        # and neither has a bar next to a missing close
+        delta = 0.0 if self._previous is None else close - self._previous
+        if math.isnan(delta):
+            delta = 0.0
+        self._previous = close
+
+        gain = max(delta, 0.0)
+        loss = max(-delta, 0.0)
+        self._gain_sum += gain - (self._gains.push(gain) or 0.0)
+        self._loss_sum += loss - (self._losses.push(loss) or 0.0)
+
+        if not self._gains.full:
+            return self._output(NAN)
+
+        # Guard against tiny negative sums left by floating point drift
+        avg_gain = max(self._gain_sum, 0.0) / self.window
+        avg_loss = max(self._loss_sum, 0.0) / self.window
+        if avg_loss == 0:
+            value = NAN if avg_gain == 0 else 100.0
+        else:
+            value = 100 - (100 / (1 + avg_gain / avg_loss))
+        return self._output(value)
+
+
+class OnlineMACD(OnlineIndicator):
+    """MACD line, signal and histogram from three running EMAs."""
+
+    name = 'macd'
+
+    def __init__(self, fast_window=12, slow_window=26, signal_window=9):
+        self.fast_window = fast_window
+        self.slow_window = slow_window
+        self.signal_window = signal_window
+        self._fast = OnlineEMA(fast_window)
+        self._slow = OnlineEMA(slow_window)
+        self._signal = OnlineEMA(signal_window)
+
+    def params(self):
+        return {
+            'fast_window': self.fast_window,
+            'slow_window': self.slow_window,
+            'signal_window': self.signal_window,
+        }
+
+    def state(self):
+        return {
+            'fast': self._fast.state(),
+            'slow': self._slow.state(),
+            'signal': self._signal.state(),
+        }
+
+    def load_state(self, state):
+        self._fast.load_state(state['fast'])
+        self._slow.load_state(state['slow'])
+        self._signal.load_state(state['signal'])
+
+    def update(self, bar):
+        close = _close_of(bar)
+        macd = self._fast.step(close) - self._slow.step(close)
+        signal = self._signal.step(macd)
+        return self._output(macd, signal, macd - signal)
+
+
+class OnlineBollingerBands(OnlineIndicator):
+    """
+    Bollinger Bands from a sliding-window mean and sum of squared deviations.
+
+    The mean and M2 of the window's valid closes are updated Welford-style
+    as values enter and leave the window, which avoids the cancellation of a
+    raw sum of squares.
+    """
+
+    name = 'bollinger_bands'
+
+    def __init__(self, window=20, num_std=2):
+        self.window = window
+        self.num_std = num_std
+        self._buffer = _Window(window)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._count = 0
+
+    def params(self):
+        return {'window': self.window, 'num_std': self.num_std}
+
+    def state(self):
+        return {'buffer': self._buffer.to_dict(), 'mean': self._mean,
+                'm2': self._m2, 'count': self._count}
+
+    def load_state(self, state):
+        self._buffer = _Window(self.window, **state['buffer'])
+        self._mean = state['mean']
+        self._m2 = state['m2']
+        self._count = state.get('count', len(self._buffer.values))
+
+    def update(self, bar):
+        close = _close_of(bar)
+        evicted = self._buffer.push(close)
+        entering = None if math.isnan(close) else close
+        leaving = None if evicted is None or math.isnan(evicted) else evicted
+
+        if entering is not None and leaving is not None:
+            old_mean = self._mean
+            self._mean += (entering - leaving) / self._count
+            self._m2 += (entering - leaving) * (entering - self._mean
+                                                + leaving - old_mean)
+        elif entering is not None:
+            self._count += 1
+            delta = entering - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (entering - self._mean)
+        elif leaving is not None:
+            self._count -= 1
+            if self._count:
+                delta = leaving - self._mean
+                self._mean -= delta / self._count
+                self._m2 -= delta * (leaving - self._mean)
+            else:
+                self._mean = self._m2 = 0.0
+
+        if self._count < self.window:
+            return self._output(NAN, NAN, NAN)
+
+        std = math.sqrt(max(self._m2, 0.0) / (self.window - 1))
+        return self._output(self._mean + std * self.num_std, self._mean,
+                            self._mean - std * self.num_std)
+
+
+ONLINE_INDICATORS = {
+    cls.name: cls
+    for cls in (OnlineSMA, OnlineEMA, OnlineRSI, OnlineMACD, OnlineBollingerBands)
+}
+
+
+def create_online_indicator(name, **params):
+    """
+    Create an incremental indicator by name.
+
+    Args:
+        name (str): One of 'sma', 'ema', 'rsi', 'macd', 'bollinger_bands'.
+        **params: Constructor parameters (e.g. ``window=50``).
+
+    Returns:
+        OnlineIndicator: A fresh indicator with no bars seen.
+    """
+    try:
+        cls = ONLINE_INDICATORS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown indicator: {name}")
+    return cls(**params)
+
+
+def online_indicator_from_dict(payload):
+    """Restore an indicator serialized with ``OnlineIndicator.to_dict``."""
+    indicator = create_online_indicator(payload['type'], **payload['params'])
+    indicator.load_state(payload['state'])
+    return indicator
@@ -0,0 +1,345 @@
+"""
+Cross-sectional indicators over a symbols x dates panel.
+
+Instead of looping over one DataFrame per symbol, the closes of a whole
+universe are aligned into a 2D array (one row per symbol, one column per
+date) and every indicator is computed for all symbols at once along the
+time axis.
+
+Missing bars (a symbol not trading on a date of the panel) are tracked with
+an explicit boolean mask. Each symbol's valid bars are packed together
+before computing, so rolling windows span its last ``window`` bars whatever
+calendar the other symbols trade on, EMAs and price changes run over
+consecutive bars, and the outputs are NaN at masked positions. The results
+equal those of ``technical_indicators`` on each symbol's own frame.
+"""
+import numpy as np
+import pandas as pd
+
+from .data_service import get_stock_data_many
+from .technical_indicators import indicator_columns, resolve_indicator_requests
+
+
+class Panel:
+    """
+    Aligned close and volume matrices for a universe of symbols.
+
+    Indicators are computed from the closes; the screener reports the
+    latest volume.
+
+    Args:
+        symbols (list): Row labels.
+        dates (pandas.DatetimeIndex): Column labels, sorted ascending.
+        close (numpy.ndarray): Closes, shape ``(len(symbols), len(dates))``.
+        volume (numpy.ndarray): Volumes, same shape as ``close``.
+        mask (numpy.ndarray): True where a symbol has a bar on a date.
+    """
+
+    def __init__(self, symbols, dates, close, volume=None, mask=None):
+        self.symbols = list(symbols)
+        self.dates = pd.DatetimeIndex(dates)
+        self.close = np.ascontiguousarray(close, dtype='float64')
+        if volume is None:
+            volume = np.full_like(self.close, np.nan)
+        self.volume = np.ascontiguousarray(volume, dtype='float64')
+        if mask is None:
+            mask = ~np.isnan(self.close)
+        self.mask = np.asarray(mask, dtype=bool)
+
+    @classmethod
+    def from_frames(cls, frames):
+        """
+        Align per-symbol frames into a panel.
+
+        Args:
+            frames (dict): Symbol to DataFrame with 'Date', 'Close' and
+                'Volume' columns (the ``get_stock_data`` layout).
+
+        Returns:
+            Panel: Panel over the union of all dates.
+        """
+        symbols = list(frames)
+        indexed = {
+            symbol: frame.set_index(pd.DatetimeIndex(frame['Date']))
+            for symbol, frame in frames.items()
+        }
+        dates = pd.DatetimeIndex(sorted(
+            set().union(*(frame.index for frame in indexed.values()))
+        )) if indexed else pd.DatetimeIndex([])
+
+        close = np.full((len(symbols), len(dates)), np.nan)
+        volume = np.full((len(symbols), len(dates)), np.nan)
+        for row, symbol in enumerate(symbols):
+            frame = indexed[symbol]
+            columns = dates.get_indexer(frame.index)
+            close[row, columns] = frame['Close'].to_numpy(dtype='float64')
+            volume[row, columns] = frame['Volume'].to_numpy(dtype='float64')
+
+        return cls(symbols, dates, close, volume)
+
+    def frame(self, values):
+        """Wrap a panel-shaped array as a symbols x dates DataFrame."""
+        return pd.DataFrame(values, index=self.symbols, columns=self.dates)
+
+
+class PanelIndicatorEngine:
+    """
+    Computes indicators for every symbol of a panel in one pass per primitive.
+
+    The valid bars of each symbol are packed to the start of its row, so
+    every primitive runs over the symbol's own consecutive bars; results are
+    scattered back to the panel dates at the end.
+
+    Args:
+        panel (Panel): Aligned universe data.
+        min_periods (int): Valid bars required in a rolling window; defaults
+            to the full window.
+    """
+
+    def __init__(self, panel, min_periods=None):
+        self.panel = panel
+        self.min_periods = min_periods
+        self._memo = {}
+
+        # Valid columns of each row first, in date order
+        mask = panel.mask & ~np.isnan(panel.close)
+        self.order = np.argsort(~mask, axis=1, kind='stable')
+        self.valid = np.arange(mask.shape[1]) < mask.sum(axis=1)[:, None]
+        close = np.take_along_axis(panel.close, self.order, axis=1)
+        self.close = np.where(self.valid, close, np.nan)
+
+        # Closes shifted per symbol by its first close so the prefix sums of
+        # squares stay small
+        shift = self.close[:, 0] if self.close.size else np.zeros(len(close))
+        self.shift = np.where(np.isnan(shift), 0.0, shift)[:, None]
+        self.centered = np.where(self.valid, self.close - self.shift, 0.0)
+
+    def _cached(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def _unpack(self, values):
+        """Scatter packed values back to their panel dates."""
+        result = np.empty_like(values)
+        np.put_along_axis(result, self.order,
+                          np.where(self.valid, values, np.nan), axis=1)
+        return result
+
+    def _prefix(self, name, values):
+        return self._cached(('prefix', name), lambda: _prefix_sums(values))
+
+    def _window(self, prefix, window):
+        """Trailing window sums along the packed bars from prefix sums."""
+        rows, columns = prefix.shape[0], prefix.shape[1] - 1
+        result = np.full((rows, columns), np.nan)
+        if window <= columns:
+            result[:, window - 1:] = prefix[:, window:] - prefix[:, :columns - window + 1]
+        # Shorter windows at the start of each history, for ``min_periods``
+        head = min(window - 1, columns)
+        result[:, :head] = prefix[:, 1:head + 1]
+        return result
+
+    def _counts(self, window):
+        counts = self._window(self._prefix('count', self.valid.astype('float64')), window)
+        required = window if self.min_periods is None else min(self.min_periods, window)
+        return counts, counts >= required
+
+    def _mean(self, window):
+        def compute():
+            counts, enough = self._counts(window)
+            sums = self._window(self._prefix('sum', self.centered), window)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = sums / counts + self.shift
+            return np.where(enough, mean, np.nan)
+        return self._cached(('mean', window), compute)
+
+    def _std(self, window):
+        def compute():
+            counts, enough = self._counts(window)
+            sums = self._window(self._prefix('sum', self.centered), window)
+            squares = self._window(
+                self._prefix('squares', self.centered * self.centered), window)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                variance = (squares - sums * sums / counts) / (counts - 1)
+            std = np.sqrt(np.maximum(variance, 0.0))
+            return np.where(enough & (counts > 1), std, np.nan)
+        return self._cached(('std', window), compute)
+
+    def _ema(self, span):
+        return self._cached(('ema', span), lambda: _ema(self.close, span))
+
+    def _macd(self, fast_window, slow_window, signal_window):
+        def compute():
+            macd = self._ema(fast_window) - self._ema(slow_window)
+            signal = _ema(macd, signal_window)
+            return macd, signal, macd - signal
+        return self._cached(('macd', fast_window, slow_window, signal_window),
+                            compute)
+
+    def rolling_mean(self, window):
+        """Simple moving average of close over each symbol's last bars."""
+        return self._unpack(self._mean(window))
+
+    def rolling_std(self, window):
+        """Sample standard deviation (ddof=1) of close."""
+        return self._unpack(self._std(window))
+
+    def ema(self, span):
+        """EMA of close (``adjust=False``), carried across missing bars."""
+        return self._unpack(self._ema(span))
+
+    def rsi(self, window=14):
+        """RSI from rolling means of gains and losses."""
+        def compute():
+            gain, loss = self._cached(('gain_loss',), self._gains_losses)
+            counts, enough = self._counts(window)
+            avg_gain = self._window(self._prefix('gain', gain), window)
+            avg_loss = self._window(self._prefix('loss', loss), window)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+            return np.where(enough, rsi, np.nan)
+        return self._unpack(self._cached(('rsi', window), compute))
+
+    def _gains_losses(self):
+        """Gains and losses between consecutive bars of each symbol."""
+        # The first bar has no change, which counts as zero gain and loss
+        delta = np.zeros_like(self.close)
+        delta[:, 1:] = np.where(self.valid[:, 1:],
+                                self.close[:, 1:] - self.close[:, :-1], 0.0)
+        return np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+
+    def macd(self, fast_window=12, slow_window=26, signal_window=9):
+        """MACD line, signal line and histogram."""
+        return tuple(self._unpack(values) for values in
+                     self._macd(fast_window, slow_window, signal_window))
+
+    def bollinger_bands(self, window=20, num_std=2):
+        """Upper, middle and lower Bollinger Bands."""
+        middle = self._mean(window)
+        band = self._std(window) * num_std
+        return (self._unpack(middle + band), self._unpack(middle),
+                self._unpack(middle - band))
+
+    def compute_request(self, family, params):
+        """
+        Calculate one indicator family for one parameter set.
+
+        Returns:
+            dict: Output column name to a symbols x dates array.
+        """
+        names = indicator_columns(family, params)
+
+        if family == 'sma':
+            values = [self.rolling_mean(params['window'])]
+        elif family == 'ema':
+            values = [self.ema(params['window'])]
+        elif family == 'rsi':
+            values = [self.rsi(params['window'])]
+        elif family == 'macd':
+            values = self.macd(params['fast_window'], params['slow_window'],
+                               params['signal_window'])
+        elif family == 'bollinger_bands':
+            values = self.bollinger_bands(params['window'], params['num_std'])
+        else:
+            raise ValueError(f"Unknown indicator: {family}")
+
+        return dict(zip(names, values))
+
+    def compute(self, indicators, parameters=None):
+        """
+        Calculate the requested indicator families for every symbol.
+
+        Args:
+            indicators (list): Indicator families, as for
+                ``calculate_technical_indicators``.
+            parameters (dict): Optional parameter sets per family.
+
+        Returns:
+            dict: Indicator name to a symbols x dates array.
+        """
+        result = {}
+        for family, params in resolve_indicator_requests(indicators, parameters):
+            result.update(self.compute_request(family, dict(params)))
+        return result
+
+
+# Natural log of the largest ``d**-t`` an EMA block may scale by
+_EMA_BLOCK_RANGE = 300.0
+
+
+def _prefix_sums(values):
+    """Prefix sums along time with a leading zero column."""
+    prefix = np.zeros((values.shape[0], values.shape[1] + 1))
+    np.cumsum(values, axis=1, out=prefix[:, 1:])
+    return prefix
+
+
+def _ema(values, span):
+    """
+    EMA (``adjust=False``) along time for every row at once.
+
+    Rows hold consecutive bars from the first column, followed by NaN
+    padding. With ``d = 1 - alpha`` the recursion has the closed form
+    ``ema[t] = d**t * (x[0] + sum(alpha * x[k] / d**k for k in 1..t))``, a
+    cumulative sum; it is evaluated in blocks short enough for ``d**-t`` to
+    stay finite, each block starting from the last EMA of the previous one.
+    """
+    alpha = 2.0 / (span + 1)
+    decay = 1.0 - alpha
+    result = np.full(values.shape, np.nan)
+    columns = values.shape[1]
+    if columns == 0 or decay == 0:
+        return values.astype('float64')
+
+    block = max(1, int(_EMA_BLOCK_RANGE / -np.log(decay)))
+    # The EMA starts at the first bar
+    weights = alpha * values
+    weights[:, 0] = values[:, 0]
+    state = None
+    start = 0
+    while start < columns:
+        stop = min(start + block, columns)
+        powers = decay ** np.arange(1, stop - start + 1)
+        terms = weights[:, start:stop] / powers
+        if state is not None:
+            terms[:, 0] += state
+        result[:, start:stop] = np.cumsum(terms, axis=1) * powers
+        state = result[:, stop - 1]
+        start = stop
+
+    return result
+
+
+def calculate_panel_indicators(panel, indicators=None, parameters=None,
+                               min_periods=None):
+    """
+    Calculate technical indicators for every symbol of a panel.
+
+    Args:
+        panel (Panel): Aligned universe data.
+        indicators (list): Indicator families to calculate.
+        parameters (dict): Optional parameter sets per family.
+        min_periods (int): Valid bars required in a rolling window.
+
+    Returns:
+        dict: Indicator name to a symbols x dates array.
+    """
+    if indicators is None:
+        indicators = ['sma', 'ema', 'rsi', 'macd', 'bollinger_bands']
+
+    return PanelIndicatorEngine(panel, min_periods).compute(indicators, parameters)
+
+
+def get_universe_panel(symbols, timeframe='1y'):
+    """
+    Fetch a universe with one batched download and align it into a panel.
+
+    Args:
+        symbols (list): Stock symbols.
+        timeframe (str): Time period to fetch data for.
+
+    Returns:
+        Panel: Aligned close and volume matrices.
+    """
+    return Panel.from_frames(get_stock_data_many(symbols, timeframe))
@@ -0,0 +1,115 @@
+"""
+Offline precomputation of indicators, fitted models and forecasts.
+
+Meant to run after market close (see the ``precompute`` management
+command): history for the whole universe is refreshed with batched
+downloads, then each symbol's indicators, model fits and forecasts are
+computed in a separate process. The fits land in the model registry and the
+forecasts in the forecast store, so daytime prediction requests become
+lookups.
+"""
+import time
+from concurrent.futures import as_completed
+
+from .data_service import (date_range_window, get_stock_data, normalize_symbol,
+                           refresh_history_many)
+from .forecast_store import get_forecast_store
+from .indicator_cache import data_version, get_cached_indicators
+from .model_registry import get_model_registry
+from .prediction_service import MODEL_FITTERS, forecast
+from .universe import worker_pool
+
+# Training window used by the prediction endpoint
+TRAINING_TIMEFRAME = '2y'
+
+
+def precompute_symbol(symbol, model_types=None, timeframe=TRAINING_TIMEFRAME,
+                      horizon=365):
+    """
+    Compute indicators, fit every model and store the forecasts of one symbol.
+
+    Args:
+        symbol (str): Exchange-qualified stock symbol.
+        model_types (list): Model types to fit; defaults to all of them.
+        timeframe (str): Training window.
+        horizon (int): Days to forecast.
+
+    Returns:
+        dict: 'symbol', 'rows' trained on, 'models' forecast and 'timings'
+        (seconds per stage).
+    """
+    if model_types is None:
+        model_types = list(MODEL_FITTERS)
+
+    timings = {}
+    started = time.perf_counter()
+    data = get_stock_data(symbol, timeframe)
+    timings['load'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indicators = get_cached_indicators(symbol, data)
+    timings['indicators'] = time.perf_counter() - started
+
+    version = data_version(data)
+    registry = get_model_registry()
+    store = get_forecast_store()
+    forecasted = 0
+    timings['fit'] = timings['forecast'] = 0.0
+
+    for model_type in model_types:
+        started = time.perf_counter()
+        model = registry.get_or_fit(symbol, model_type, indicators, version)
+        timings['fit'] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = forecast(model, horizon)
+        if result is not None:
+            store.write(symbol, model_type, version, result)
+            forecasted += 1
+        timings['forecast'] += time.perf_counter() - started
+
+    return {'symbol': symbol, 'rows': len(data), 'models': forecasted,
+            'timings': timings}
+
+
+def precompute_universe(symbols, model_types=None, timeframe=TRAINING_TIMEFRAME,
+                        horizon=365, workers=None, on_result=None):
+    """
+    Precompute every symbol of a universe across a process pool.
+
+    History is refreshed first, in the calling process, with batched
+    downloads; the workers then only read the stored bars.
+
+    Args:
+        symbols (list): Stock symbols.
+        model_types (list): Model types to fit; defaults to all of them.
+        timeframe (str): Training window.
+        horizon (int): Days to forecast.
+        workers (int): Worker processes; defaults to the CPU count.
+        on_result (callable): Called with each result dict as symbols
+            finish, or with ``{'symbol', 'error'}`` when one fails.
+
+    Returns:
+        list: Result dicts, in completion order.
+    """
+    symbols = list(dict.fromkeys(normalize_symbol(symbol) for symbol in symbols))
+    start_date, end_date = date_range_window(timeframe)
+    refresh_history_many(symbols, start_date, end_date)
+
+    results = []
+    with worker_pool(workers) as pool:
+        futures = {
+            pool.submit(precompute_symbol, symbol, model_types, timeframe,
+                        horizon): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'symbol': futures[future], 'error': str(e)}
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    return results
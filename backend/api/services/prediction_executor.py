@@ -0,0 +1,258 @@
+"""
+Runs model fits in dedicated worker processes.
+
+Fitting is CPU-bound and can take seconds, so it is kept out of the request
+threads: each fit is sent to one of a few long-lived worker processes and
+the request thread only waits for the result. Admission is bounded - at most
+``workers + queue_size`` fits are running or waiting at any time and further
+requests are turned away immediately - and each model type can be limited
+to fewer concurrent fits than there are workers. A fit running past the
+timeout has its worker process killed and replaced.
+"""
+import atexit
+import multiprocessing
+import queue
+import threading
+
+from django.conf import settings
+
+from .prediction_service import fit_model
+
+
+class PredictionQueueFull(Exception):
+    """Raised when the executor cannot admit more work; retry later."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PredictionTimeout(Exception):
+    """Raised when a fit ran past the timeout and was killed."""
+
+
+def _worker_main(conn):
+    """Worker process loop: run each received call and send back its outcome."""
+    import django
+    django.setup()
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        fn, args, kwargs = job
+        try:
+            outcome = (True, fn(*args, **kwargs))
+        except Exception as e:
+            outcome = (False, e)
+        try:
+            conn.send(outcome)
+        except Exception as e:
+            # The result or exception could not be pickled
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _Worker:
+    """A worker process and the parent's end of its pipe."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def call(self, fn, args, kwargs, timeout):
+        """
+        Run ``fn`` in the worker and return its result.
+
+        Raises:
+            PredictionTimeout: If no result arrived within ``timeout``.
+            EOFError: If the worker died.
+        """
+        self.conn.send((fn, args, kwargs))
+        if not self.conn.poll(timeout):
+            raise PredictionTimeout(f"Prediction did not finish within {timeout}s")
+        ok, value = self.conn.recv()
+        if not ok:
+            raise value
+        return value
+
+    def stop(self, kill=False):
+        """Stop the process, killing it if it is busy or ``kill`` is set."""
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class PredictionExecutor:
+    """
+    Bounded pool of worker processes for model fits.
+
+    Args:
+        workers (int): Worker processes. 0 runs fits in the calling thread
+            (still subject to admission and per-model limits, but without the
+            timeout).
+        queue_size (int): Fits allowed to wait for a worker.
+        timeout (float): Seconds a fit may run before its worker is killed;
+            also the longest time a fit may wait for a worker.
+        model_limits (dict): Model type to maximum concurrent fits.
+        retry_after (int): Seconds suggested to rejected clients.
+        start_method (str): multiprocessing start method of the workers.
+    """
+
+    def __init__(self, workers=2, queue_size=8, timeout=30, model_limits=None,
+                 retry_after=5, start_method='spawn'):
+        self.workers = workers
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._context = multiprocessing.get_context(start_method)
+        self._admission = threading.BoundedSemaphore(workers + queue_size)
+        self._model_limits = {
+            model_type: threading.BoundedSemaphore(limit)
+            for model_type, limit in (model_limits or {}).items()
+        }
+
+        # Workers are started on first use and replaced after a kill
+        self._idle = queue.LifoQueue()
+        for _ in range(workers):
+            self._idle.put(None)
+
+        self._lock = threading.Lock()
+        self._all = []
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def fit(self, model_type, data, features=None, **params):
+        """``prediction_service.fit_model`` run through the executor."""
+        return self.run(model_type, fit_model, model_type, data, features,
+                        **params)
+
+    def run(self, model_type, fn, *args, **kwargs):
+        """
+        Run ``fn(*args, **kwargs)`` in a worker process.
+
+        Args:
+            model_type (str): Model type the call belongs to, for the
+                per-model concurrency limit.
+            fn (callable): Picklable module-level function.
+
+        Returns:
+            The function's result.
+
+        Raises:
+            PredictionQueueFull: If too many fits are running or waiting, or
+                none could start within the timeout.
+            PredictionTimeout: If the fit ran past the timeout.
+        """
+        if not self._admission.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PredictionQueueFull("Too many predictions in progress",
+                                      self.retry_after)
+        try:
+            limit = self._model_limits.get(model_type)
+            if limit is not None and not limit.acquire(timeout=self.timeout):
+                raise PredictionQueueFull(
+                    f"Too many {model_type} predictions in progress",
+                    self.retry_after)
+            try:
+                return self._run_in_worker(fn, args, kwargs)
+            finally:
+                if limit is not None:
+                    limit.release()
+        finally:
+            self._admission.release()
+
+    def _run_in_worker(self, fn, args, kwargs):
+        if self.workers == 0:
+            result = fn(*args, **kwargs)
+            with self._lock:
+                self.completed += 1
+            return result
+
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PredictionQueueFull("No prediction worker became available",
+                                      self.retry_after)
+
+        try:
+            if worker is None:
+                worker = _Worker(self._context)
+                with self._lock:
+                    self._all.append(worker)
+            result = worker.call(fn, args, kwargs, self.timeout)
+        except PredictionTimeout:
+            with self._lock:
+                self.timed_out += 1
+            worker = self._discard(worker)
+            raise
+        except (EOFError, OSError):
+            worker = self._discard(worker)
+            raise RuntimeError("Prediction worker exited unexpectedly")
+        finally:
+            self._idle.put(worker)
+
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def _discard(self, worker):
+        """Kill a worker; its slot gets a fresh process on next use."""
+        if worker is not None:
+            worker.stop(kill=True)
+            with self._lock:
+                self._all.remove(worker)
+        return None
+
+    def shutdown(self):
+        """Stop every worker process."""
+        with self._lock:
+            workers, self._all = self._all, []
+        for worker in workers:
+            worker.stop(kill=True)
+
+    def stats(self):
+        """Return counters of completed, rejected and timed-out fits."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'running': len(self._all),
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+            }
+
+
+_default_executor = None
+_default_executor_guard = threading.Lock()
+
+
+def get_prediction_executor():
+    """Return the process-wide executor configured by the PREDICTION_* settings."""
+    global _default_executor
+    with _default_executor_guard:
+        if _default_executor is None:
+            _default_executor = PredictionExecutor(
+                workers=settings.PREDICTION_WORKERS,
+                queue_size=settings.PREDICTION_QUEUE_SIZE,
+                timeout=settings.PREDICTION_TIMEOUT,
+                model_limits=settings.PREDICTION_MODEL_CONCURRENCY,
+                retry_after=settings.PREDICTION_RETRY_AFTER)
+            atexit.register(_default_executor.shutdown)
+        return _default_executor
@@ -1,73 +1,207 @@
 """
 Service for making stock price predictions using different models.
+
+Each model type has a ``fit_*`` function returning a fitted model and a
+``predict_with_*`` function that fits and forecasts in one go. Fitted models
+are plain picklable objects with a ``forecast(days_to_predict)`` method, so
+they can be stored and reused by the model registry, and a
+``predict_prices(days_to_predict)`` method returning the bare price array
+for callers that do not need the dates.
 """
+import inspect
+
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
 
-def simple_prediction(data, days_to_predict):
+
+class TrendModel:
     """
-    Makes a simple prediction based on recent trend
+    Extrapolates the average daily change of the recent SMA_20.
+
+    Args:
+        last_date: Date of the last bar the model was fitted on.
+        last_price (float): Last SMA_20 value.
+        avg_change (float): Average daily change of the SMA_20.
     """
-    if len(data) < 10:
+
+    def __init__(self, last_date, last_price, avg_change):
+        self.last_date = last_date
+        self.last_price = last_price
+        self.avg_change = avg_change
+
+    def predict_prices(self, days_to_predict):
+        """
+        Predict the prices of the next ``days_to_predict`` bars.
+
+        Returns:
+            numpy.ndarray: One price per step, never below zero.
+        """
+        steps = np.arange(1, days_to_predict + 1)
+        return np.maximum(self.last_price + self.avg_change * steps, 0)
+
+    def forecast(self, days_to_predict):
+        """
+        Predict prices for the calendar days after the last bar.
+
+        Days falling on a weekend are dated the following Monday, as
+        markets are closed then, so a Monday can appear up to three times.
+
+        Returns:
+            pandas.DataFrame: 'Date' and 'Predicted_Price' columns.
+        """
+        steps = np.arange(1, days_to_predict + 1)
+
+        # Calculate next dates; weekend days move to the following Monday
+        future_dates = (pd.to_datetime(self.last_date)
+                        + pd.to_timedelta(steps, unit='D'))
+        weekday = future_dates.weekday
+        future_dates = future_dates + pd.to_timedelta(
+            np.select([weekday == 5, weekday == 6], [2, 1], 0), unit='D')
+
+        # Predict future prices based on average change
+        predicted_prices = self.predict_prices(days_to_predict)
+
+        # Create DataFrame for predictions
+        prediction_df = pd.DataFrame({
+            'Date': future_dates,
+            'Predicted_Price': predicted_prices
+        })
+
+        prediction_df.replace([float('inf'), float('-inf')], float('nan'), inplace=True)
+        prediction_df.dropna(inplace=True)
+
+        return prediction_df
+
+
+def fit_trend_model(data):
+    """
+    Fits a simple model of the recent trend.
+
+    Returns:
+        TrendModel or None: None if there are fewer than 10 bars.
+    """
+    if len(data['Date']) < 10:
         return None
-    
+
     # Get the last 30 days of adjusted close prices
     recent_prices = data['SMA_20'].tail(30).values
-    
-    recent_prices = recent_prices.flatten() 
+
+    recent_prices = recent_prices.flatten()
     # Calculate average daily change
     daily_changes = np.diff(recent_prices)
     avg_change = np.mean(daily_changes)
-    
+
     # Get the last price
     last_price = recent_prices[-1]
-    
-    # Predict future prices based on average change
-    future_dates = []
-    predicted_prices = []
-    last_date = data['Date'].values[-1]
-    
-    for i in range(1, days_to_predict + 1):
-        # Calculate next date (skip weekends)
-        next_date = pd.to_datetime(last_date) + timedelta(days=i)
-        while next_date.weekday() > 4:  # Skip Saturday (5) and Sunday (6)
-            next_date = next_date + timedelta(days=1)
-            
-        # Calculate predicted price
-        next_price = last_price + (avg_change * i)
-        
-        # Make sure price doesn't go negative
-        next_price = max(next_price, 0)
-        
-        # Add to results
-        future_dates.append(next_date)
-        predicted_prices.append(next_price)
-    
-    # Create DataFrame for predictions
-    prediction_df = pd.DataFrame({
-        'Date': future_dates,
-        'Predicted_Price': predicted_prices
-    })
-
-    prediction_df.replace([float('inf'), float('-inf')], float('nan'), inplace=True)
-    prediction_df.dropna(inplace=True)
-    
-    return prediction_df
+
+    return TrendModel(data['Date'].values[-1], last_price, avg_change)
+
+
+def simple_prediction(data, days_to_predict):
+    """
+    Makes a simple prediction based on recent trend
+    """
+    return forecast(fit_trend_model(data), days_to_predict)
+
+
+def forecast(model, days_to_predict):
+    """
+    Forecast with a fitted model.
+
+    Returns:
+        pandas.DataFrame or None: None if no model could be fitted.
+    """
+    if model is None:
+        return None
+    return model.forecast(days_to_predict)
+
+
+def fit_linear_regression(df, features=None):
+    """Simplified linear regression fit"""
+    return fit_trend_model(df)
+
+def fit_random_forest(df, features=None):
+    """Simplified random forest fit"""
+    return fit_trend_model(df)
+
+def fit_svm(df, features=None):
+    """Simplified SVM fit"""
+    return fit_trend_model(df)
+
+def fit_lstm(df, features=None, target='Close', window_size=60):
+    """Simplified LSTM fit"""
+    return fit_trend_model(df)
+
+
+# Fit function of each model type accepted by the prediction endpoint
+MODEL_FITTERS = {
+    'linear': fit_linear_regression,
+    'random_forest': fit_random_forest,
+    'svm': fit_svm,
+    'lstm': fit_lstm,
+}
+
+
+def validate_model_parameters(model_type, params):
+    """
+    Check hyperparameter names against the fit function of a model type.
+
+    Args:
+        model_type (str): One of ``MODEL_FITTERS``.
+        params (dict): Hyperparameters by name.
+
+    Raises:
+        ValueError: If the model type is unknown or a name is not a
+            hyperparameter of its fit function.
+    """
+    try:
+        fitter = MODEL_FITTERS[model_type]
+    except KeyError:
+        raise ValueError(f"Unknown model type: {model_type}")
+    # The data and feature columns are passed by the caller, not as params
+    accepted = [name for name in inspect.signature(fitter).parameters
+                if name not in ('df', 'features')]
+    unknown = sorted(set(params or {}) - set(accepted))
+    if unknown:
+        raise ValueError(
+            f"Unknown parameters for {model_type}: {', '.join(unknown)} "
+            f"(accepted: {', '.join(accepted) or 'none'})")
+
+
+def fit_model(model_type, df, features=None, **params):
+    """
+    Fit a model of the given type.
+
+    Args:
+        model_type (str): One of ``MODEL_FITTERS``.
+        df (dict or pandas.DataFrame): Prices with technical indicators.
+        features (list): Feature columns, for models that take them.
+        **params: Model hyperparameters.
+
+    Returns:
+        object or None: Fitted model with a ``forecast`` method, or None if
+        there is not enough data.
+
+    Raises:
+        ValueError: If the model type or a parameter name is unknown.
+    """
+    validate_model_parameters(model_type, params)
+    return MODEL_FITTERS[model_type](df, features, **params)
 
 
 def predict_with_linear_regression(df, days_to_predict, features=None):
     """Simplified linear regression prediction"""
-    return simple_prediction(df, days_to_predict)
+    return forecast(fit_linear_regression(df, features), days_to_predict)
 
 def predict_with_random_forest(df, days_to_predict, features=None):
     """Simplified random forest prediction"""
-    return simple_prediction(df, days_to_predict)
+    return forecast(fit_random_forest(df, features), days_to_predict)
 
 def predict_with_svm(df, days_to_predict, features=None):
     """Simplified SVM prediction"""
-    return simple_prediction(df, days_to_predict)
+    return forecast(fit_svm(df, features), days_to_predict)
 
 def predict_with_lstm(df, days_to_predict, target='Close', window_size=60):
     """Simplified LSTM prediction"""
-    return simple_prediction(df, days_to_predict)
+    return forecast(fit_lstm(df, target=target, window_size=window_size),
+                    days_to_predict)
@@ -0,0 +1,182 @@
+"""
+Market data providers.
+
+Every upstream price download in the services goes through the provider
+configured in ``settings.MARKET_DATA_PROVIDER``. Providers return frames in
+the layout of ``yf.download(symbols, group_by='ticker')``: a ``Date`` index
+and ``(Ticker, Price)`` columns.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import pandas as pd
+import yfinance as yf
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .history_store import split_download
+from .sample_data import generate_sample_market
+
+
+class MarketDataProvider(ABC):
+    """Base class for market data providers."""
+
+    @abstractmethod
+    def download(self, symbols, start=None, end=None, period=None):
+        """
+        Download daily bars for ``symbols``.
+
+        Args:
+            symbols (list): Tickers to download.
+            start (datetime): Start of the window (inclusive).
+            end (datetime): End of the window (exclusive).
+            period (str): yfinance period string, used instead of start/end.
+
+        Returns:
+            pandas.DataFrame: Bars with ``(Ticker, Price)`` columns.
+        """
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Downloads bars from Yahoo Finance through yfinance."""
+
+    def download(self, symbols, start=None, end=None, period=None):
+        if period is not None:
+            return yf.download(symbols, period=period, group_by='ticker')
+        return yf.download(symbols, start=start, end=end, group_by='ticker')
+
+
+class SampleProvider(MarketDataProvider):
+    """Serves deterministic synthetic bars, for demos and load tests."""
+
+    def download(self, symbols, start=None, end=None, period=None):
+        end = pd.Timestamp.now() if end is None else pd.Timestamp(end)
+        if period is not None:
+            start = end - period_to_timedelta(period)
+        # ``end`` is exclusive, as with yfinance
+        return generate_sample_market(list(symbols), start,
+                                      end - pd.Timedelta(days=1))
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Passes downloads through to another provider and records the bars.
+
+    Each symbol's bars are merged into ``<directory>/<symbol>.pkl`` so a
+    ``ReplayProvider`` can serve them later without network access.
+
+    Args:
+        directory (str): Where recordings are written; defaults to
+            ``settings.MARKET_DATA_DIR``.
+        backend (str): Dotted path of the provider to record from.
+        options (dict): Keyword arguments for that provider.
+    """
+
+    def __init__(self, directory=None,
+                 backend='api.services.providers.YFinanceProvider', options=None):
+        self.directory = Path(directory or settings.MARKET_DATA_DIR)
+        self.inner = import_string(backend)(**(options or {}))
+        self._lock = threading.Lock()
+
+    def download(self, symbols, start=None, end=None, period=None):
+        data = self.inner.download(symbols, start=start, end=end, period=period)
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for symbol, bars in split_download(data, list(symbols)).items():
+                if bars.empty:
+                    continue
+                path = recording_path(self.directory, symbol)
+                if path.exists():
+                    bars = pd.concat([pd.read_pickle(path), bars])
+                    bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+                bars.to_pickle(path)
+
+        return data
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves bars previously captured by ``RecordingProvider``.
+
+    Windows are sliced out of each symbol's recording, so a replay does not
+    need the exact same requests as the recording session.
+
+    Args:
+        directory (str): Where recordings were written; defaults to
+            ``settings.MARKET_DATA_DIR``.
+        latency (float): Seconds to sleep per download, to simulate the
+            upstream round trip; defaults to ``settings.MARKET_DATA_LATENCY``.
+    """
+
+    def __init__(self, directory=None, latency=None):
+        self.directory = Path(directory or settings.MARKET_DATA_DIR)
+        self.latency = (settings.MARKET_DATA_LATENCY if latency is None
+                        else latency)
+
+    def download(self, symbols, start=None, end=None, period=None):
+        if self.latency:
+            time.sleep(self.latency)
+
+        frames = {}
+        for symbol in symbols:
+            path = recording_path(self.directory, symbol)
+            if not path.exists():
+                continue
+            bars = pd.read_pickle(path)
+            if period is not None:
+                last = bars.index[-1] if len(bars) else pd.Timestamp.now()
+                bars = bars.loc[last - period_to_timedelta(period):]
+            else:
+                if start is not None:
+                    bars = bars.loc[pd.Timestamp(start).normalize():]
+                if end is not None:
+                    bars = bars.loc[bars.index < pd.Timestamp(end)]
+            frames[symbol] = bars
+
+        if not frames:
+            return pd.DataFrame()
+        data = pd.concat(frames, axis=1)
+        data.columns.names = ['Ticker', 'Price']
+        return data
+
+
+def recording_path(directory, symbol):
+    """Return the recording file for ``symbol`` inside ``directory``."""
+    safe_name = symbol.replace('/', '_').replace('^', '_')
+    return Path(directory) / f"{safe_name}.pkl"
+
+
+def period_to_timedelta(period):
+    """Translate a yfinance period string ('5d', '1mo', '2y') to a timedelta."""
+    if period.endswith('mo'):
+        return pd.Timedelta(days=int(period[:-2]) * 30)
+    if period.endswith('d'):
+        return pd.Timedelta(days=int(period[:-1]))
+    if period.endswith('wk'):
+        return pd.Timedelta(weeks=int(period[:-2]))
+    if period.endswith('y'):
+        return pd.Timedelta(days=int(period[:-1]) * 365)
+    raise ValueError(f"Unsupported period: {period}")
+
+
+_provider = None
+_provider_guard = threading.Lock()
+
+
+def get_market_data_provider():
+    """
+    Return the provider configured in ``settings.MARKET_DATA_PROVIDER``.
+
+    Raises:
+        ImportError: If the backend cannot be imported.
+        TypeError: If the options do not fit the backend.
+    """
+    global _provider
+    with _provider_guard:
+        if _provider is None:
+            config = settings.MARKET_DATA_PROVIDER
+            _provider = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+        return _provider
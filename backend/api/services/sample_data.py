@@ -0,0 +1,167 @@
+"""
+Deterministic synthetic market data.
+
+Used when real data from yfinance is unavailable, for offline demos and for
+load testing with large universes.
+
+Every symbol gets a fixed seed derived from its name, and every business day
+gets a fixed position in the symbol's random streams (counted from
+``SAMPLE_EPOCH``). The same symbol therefore produces the same bar for the
+same day in every process and for every requested window.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Day the synthetic random walks are anchored at (ordinal 0)
+SAMPLE_EPOCH = np.datetime64('2020-01-01', 'D')
+
+# Independent random streams per symbol, so each column keeps its own
+# sequence whatever the window length
+_STREAMS = ('returns', 'open', 'high', 'low', 'volume')
+
+# Starting price and daily volatility for well-known symbols
+_PROFILES = (
+    (('RELIANCE',), 2500, 0.015),
+    (('TCS',), 3400, 0.01),
+    (('HDFC',), 1600, 0.012),
+    (('INFOSYS', 'INFY'), 1400, 0.011),
+    (('POLYCAB',), 5800, 0.018),
+)
+_DEFAULT_PROFILE = (1000, 0.013)
+
+
+def symbol_seed(symbol):
+    """
+    Return a seed for ``symbol`` that is stable across processes.
+
+    Unlike ``hash()``, CRC32 is not affected by hash randomization.
+    """
+    return zlib.crc32(symbol.encode('utf-8'))
+
+
+def symbol_profile(symbol):
+    """Return ``(base_price, volatility)`` for a symbol."""
+    for names, base_price, volatility in _PROFILES:
+        if any(name in symbol for name in names):
+            return base_price, volatility
+    return _DEFAULT_PROFILE
+
+
+def business_days(start_date, end_date):
+    """Return the business days between two dates as ``datetime64[D]``."""
+    return pd.date_range(start=start_date, end=end_date,
+                         freq='B').values.astype('datetime64[D]')
+
+
+def sample_ohlcv(symbol, days):
+    """
+    Generate synthetic OHLCV arrays for a symbol on the given business days.
+
+    Args:
+        symbol (str): Stock symbol.
+        days (numpy.ndarray): Sorted business days as ``datetime64[D]``.
+
+    Returns:
+        dict: Column name to ``numpy.ndarray`` (Open, High, Low, Close, Volume).
+    """
+    base_price, volatility = symbol_profile(symbol)
+    ordinals = np.busday_count(SAMPLE_EPOCH, days)
+
+    forward = int(max(ordinals.max(initial=0), 0))
+    backward = int(max(-ordinals.min(initial=0), 0))
+
+    children = np.random.SeedSequence(symbol_seed(symbol)).spawn(2 * len(_STREAMS))
+    rngs = {}
+    for i, (direction, kind) in enumerate(
+            (d, k) for d in ('forward', 'backward') for k in _STREAMS):
+        rngs[(direction, kind)] = np.random.default_rng(children[i])
+
+    # Random walk outward from the epoch in both directions, with mean
+    # slightly positive for upward trend
+    up = np.cumprod(1 + rngs[('forward', 'returns')].normal(
+        0.0003, volatility, forward))
+    down = np.cumprod(1 + rngs[('backward', 'returns')].normal(
+        0.0003, volatility, backward))
+    # Ordinal -backward .. forward laid out contiguously
+    path = np.concatenate([base_price / down[::-1], [base_price],
+                           base_price * up])
+
+    def noise(kind, low, high):
+        return np.concatenate([
+            rngs[('backward', kind)].uniform(low, high, backward)[::-1],
+            rngs[('forward', kind)].uniform(low, high, forward + 1),
+        ])
+
+    positions = ordinals + backward
+    close = path[positions]
+    open_ = close * noise('open', 0.995, 1.0)[positions]
+    high = close * noise('high', 1.001, 1.02)[positions]
+    low = close * noise('low', 0.98, 0.999)[positions]
+    volume = np.floor(noise('volume', 100000, 1000000)[positions])
+
+    # Ensure High >= Open, Close and Low <= Open, Close
+    high = np.maximum(high, np.maximum(open_, close))
+    low = np.minimum(low, np.minimum(open_, close))
+
+    return {'Open': open_, 'High': high, 'Low': low, 'Close': close,
+            'Volume': volume}
+
+
+def generate_sample_stock_data(symbol, start_date, end_date):
+    """
+    Generate synthetic stock data for demonstration purposes.
+    This function is used when actual data from yfinance is unavailable.
+
+    Args:
+        symbol (str): Stock symbol
+        start_date (datetime): Start date
+        end_date (datetime): End date
+
+    Returns:
+        pandas.DataFrame: DataFrame with synthetic stock data
+    """
+    days = business_days(start_date, end_date)
+    columns = sample_ohlcv(symbol, days)
+
+    data = pd.DataFrame(columns, index=pd.DatetimeIndex(days, name='Date'))
+    data['Volume'] = data['Volume'].astype('int64')
+    data['Adj Close'] = data['Close']
+
+    # Calculate daily and cumulative returns
+    data['Returns'] = data['Adj Close'].pct_change()
+    data['Cumulative Returns'] = (1 + data['Returns'].fillna(0)).cumprod() - 1
+
+    return data
+
+
+def generate_sample_market(symbols, start_date, end_date):
+    """
+    Generate synthetic OHLCV bars for a whole universe of symbols.
+
+    The result has the same ``(Ticker, Price)`` column layout as
+    ``yf.download(symbols, group_by='ticker')``.
+
+    Args:
+        symbols (list): Stock symbols.
+        start_date (datetime): Start date
+        end_date (datetime): End date
+
+    Returns:
+        pandas.DataFrame: Bars indexed by ``Date`` for every symbol.
+    """
+    days = business_days(start_date, end_date)
+    fields = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    values = np.empty((len(days), len(symbols) * len(fields)), dtype='float64')
+    for i, symbol in enumerate(symbols):
+        columns = sample_ohlcv(symbol, days)
+        for j, field in enumerate(fields):
+            values[:, i * len(fields) + j] = columns[field]
+
+    return pd.DataFrame(
+        values,
+        index=pd.DatetimeIndex(days, name='Date'),
+        columns=pd.MultiIndex.from_product([symbols, fields],
+                                           names=['Ticker', 'Price']))
@@ -0,0 +1,279 @@
+"""
+Stock screener over a precomputed snapshot of the latest indicator values.
+
+The snapshot holds one row per symbol of the universe and one NumPy array
+per column. Every numeric column is also kept sorted, so a range predicate
+such as ``RSI < 30`` is answered with a binary search instead of a scan, and
+sorting the result reuses the same order.
+"""
+import re
+
+import numpy as np
+from django.conf import settings
+
+from .data_service import get_popular_indian_stocks
+from .market_snapshot import MarketSnapshot
+from .panel_indicators import calculate_panel_indicators, get_universe_panel
+
+# Operators accepted in filter expressions such as 'RSI<30'
+FILTER_PATTERN = re.compile(
+    r'^\s*([A-Za-z_]\w*)\s*(<=|>=|<|>|=)\s*'
+    r'([A-Za-z_]\w*|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*$')
+
+TEXT_COLUMNS = ('symbol', 'name', 'sector')
+
+
+class ScreenerIndex:
+    """
+    Columnar snapshot of the latest values per symbol with sorted indexes.
+
+    Args:
+        columns (dict): Column name to a 1D array, one entry per symbol.
+            Text columns are 'symbol', 'name' and 'sector'; everything else
+            is numeric.
+    """
+
+    def __init__(self, columns):
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        self.size = len(self.columns['symbol'])
+        self.numeric = [name for name in self.columns if name not in TEXT_COLUMNS]
+
+        # Sorted order of the non-NaN rows of each numeric column
+        self._sorted = {}
+        for name in self.numeric:
+            values = self.columns[name].astype('float64')
+            self.columns[name] = values
+            order = np.argsort(values, kind='stable')
+            order = order[~np.isnan(values[order])]
+            self._sorted[name] = (order, values[order])
+
+        self._sectors = {}
+        for row, sector in enumerate(self.columns['sector']):
+            self._sectors.setdefault(str(sector).lower(), []).append(row)
+
+    def __len__(self):
+        return self.size
+
+    def _range(self, name, op, value):
+        """Rows whose ``name`` satisfies ``op value``, via binary search."""
+        order, values = self._sorted[name]
+        if op == '<':
+            selected = order[:np.searchsorted(values, value, side='left')]
+        elif op == '<=':
+            selected = order[:np.searchsorted(values, value, side='right')]
+        elif op == '>':
+            selected = order[np.searchsorted(values, value, side='right'):]
+        elif op == '>=':
+            selected = order[np.searchsorted(values, value, side='left'):]
+        else:
+            lo = np.searchsorted(values, value, side='left')
+            hi = np.searchsorted(values, value, side='right')
+            selected = order[lo:hi]
+
+        mask = np.zeros(self.size, dtype=bool)
+        mask[selected] = True
+        return mask
+
+    def _compare(self, left, op, right):
+        """Rows where one column compares to another (e.g. Close > SMA_200)."""
+        a = self.columns[left]
+        b = self.columns[right]
+        with np.errstate(invalid='ignore'):
+            if op == '<':
+                return a < b
+            if op == '<=':
+                return a <= b
+            if op == '>':
+                return a > b
+            if op == '>=':
+                return a >= b
+            return a == b
+
+    def query(self, filters=(), sector=None, sort=None, limit=50):
+        """
+        Select, sort and limit rows of the snapshot.
+
+        Args:
+            filters (list): ``(column, operator, value)`` triples; ``value``
+                is a number or the name of another numeric column.
+            sector (str): Keep only this sector (case-insensitive).
+            sort (str): Column to sort by, prefixed with '-' for descending.
+            limit (int): Maximum number of rows returned.
+
+        Returns:
+            tuple: (matching row count, list of row dicts).
+
+        Raises:
+            ValueError: If a filter or the sort column is unknown.
+        """
+        mask = np.ones(self.size, dtype=bool)
+
+        if sector:
+            in_sector = np.zeros(self.size, dtype=bool)
+            in_sector[self._sectors.get(sector.lower(), [])] = True
+            mask &= in_sector
+
+        for column, op, value in filters:
+            if column not in self._sorted:
+                raise ValueError(f"Unknown screener column: {column}")
+            if isinstance(value, str):
+                if value not in self._sorted:
+                    raise ValueError(f"Unknown screener column: {value}")
+                mask &= self._compare(column, op, value)
+            else:
+                mask &= self._range(column, op, value)
+
+        if sort:
+            descending = sort.startswith('-')
+            column = sort.lstrip('-')
+            if column not in self._sorted:
+                raise ValueError(f"Unknown screener column: {column}")
+            order, _ = self._sorted[column]
+            if descending:
+                order = order[::-1]
+            rows = order[mask[order]]
+        else:
+            rows = np.flatnonzero(mask)
+
+        return int(mask.sum()), [self.row(row) for row in rows[:limit]]
+
+    def row(self, row):
+        """Return one row as a JSON-friendly dict (NaN becomes None)."""
+        result = {}
+        for name, values in self.columns.items():
+            value = values[row]
+            if name in TEXT_COLUMNS:
+                result[name] = str(value)
+            else:
+                result[name] = None if np.isnan(value) else round(float(value), 4)
+        return result
+
+
+def parse_filter(expression):
+    """
+    Parse a filter expression such as 'RSI<30' or 'Close>SMA_200'.
+
+    Returns:
+        tuple: (column, operator, number or column name).
+
+    Raises:
+        ValueError: If the expression is malformed.
+    """
+    match = FILTER_PATTERN.match(expression)
+    if match is None:
+        raise ValueError(f"Invalid filter: {expression}")
+    column, op, value = match.groups()
+    try:
+        value = float(value)
+    except ValueError:
+        pass
+    return column, op, value
+
+
+def build_screener_index(stocks=None):
+    """
+    Compute the latest indicator values for the universe and index them.
+
+    Args:
+        stocks (list): Stock dicts with 'symbol', 'name' and 'sector'.
+            Defaults to ``get_popular_indian_stocks()``.
+
+    Returns:
+        ScreenerIndex: The new snapshot.
+    """
+    if stocks is None:
+        stocks = get_popular_indian_stocks()
+
+    symbols = [stock['symbol'] for stock in stocks]
+    panel = get_universe_panel(symbols, settings.SCREENER_TIMEFRAME)
+    indicators = calculate_panel_indicators(panel)
+
+    # Column of each symbol's latest valid bar
+    columns = np.arange(len(panel.dates))
+    last = np.where(panel.mask, columns, -1).max(axis=1, initial=-1)
+    previous = np.where(panel.mask & (columns < last[:, None]), columns, -1).max(
+        axis=1, initial=-1)
+    rows = np.arange(len(symbols))
+
+    def latest(values):
+        return np.where(last >= 0, values[rows, np.maximum(last, 0)], np.nan)
+
+    close = latest(panel.close)
+    previous_close = np.where(previous >= 0,
+                              panel.close[rows, np.maximum(previous, 0)], np.nan)
+
+    data = {
+        'symbol': [stock['symbol'] for stock in stocks],
+        'name': [stock.get('name', '') for stock in stocks],
+        'sector': [stock.get('sector', '') or '' for stock in stocks],
+        'Close': close,
+        'Volume': latest(panel.volume),
+        'Change_Percent': (close / previous_close - 1) * 100,
+    }
+    for name, values in indicators.items():
+        data[name] = latest(values)
+
+    return ScreenerIndex(data)
+
+
+_screener_snapshot = MarketSnapshot(build_screener_index,
+                                    settings.HISTORY_REFRESH_INTERVAL)
+
+
+def get_screener_index():
+    """
+    Return the current screener snapshot.
+
+    It is rebuilt in the background once new bars were stored for a
+    symbol of the universe, and at the latest after the history refresh
+    interval.
+
+    Returns:
+        tuple: (ScreenerIndex or None, datetime or None) - the snapshot and
+        the time it was built.
+    """
+    return _screener_snapshot.get()
+
+
+def rebuild_screener_index():
+    """Rebuild the screener snapshot synchronously, e.g. after a data refresh."""
+    _screener_snapshot.refresh()
+    return _screener_snapshot.get()
+
+
+def screener_bars_changed(symbols):
+    """
+    Mark the snapshot stale when new bars were stored for any of ``symbols``.
+
+    Called from the history refresh path; the rebuild happens in the
+    background on the next screener query.
+    """
+    universe = {stock['symbol'] for stock in get_popular_indian_stocks()}
+    if universe.intersection(symbols):
+        _screener_snapshot.invalidate()
+
+
+def screen_stocks(filters=(), sector=None, sort=None, limit=50):
+    """
+    Run a screener query against the current snapshot.
+
+    Args:
+        filters (list): Filter expressions such as 'RSI<30'.
+        sector (str): Keep only this sector.
+        sort (str): Column to sort by, '-' prefix for descending.
+        limit (int): Maximum number of rows.
+
+    Returns:
+        dict: 'count' of matches, the returned 'results' and 'as_of' time,
+        or None if no snapshot could be built.
+
+    Raises:
+        ValueError: If a filter or column is invalid.
+    """
+    parsed = [parse_filter(expression) for expression in filters]
+    index, built_at = get_screener_index()
+    if index is None:
+        return None
+
+    count, results = index.query(parsed, sector=sector, sort=sort, limit=limit)
+    return {'count': count, 'results': results, 'as_of': built_at.isoformat()}
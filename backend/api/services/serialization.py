@@ -0,0 +1,217 @@
+"""
+Helpers for turning price and indicator frames into response payloads.
+
+The columnar layout sends one shared date array plus one value array per
+field, instead of one dict per row (or one date-keyed dict per indicator),
+which avoids allocating a small dict for every bar and repeating every key.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+RESPONSE_LAYOUTS = ('records', 'columnar')
+
+# Largest number of decimals a client may ask for
+MAX_PRECISION = 10
+
+# Rows serialized per chunk of a streamed NDJSON response
+NDJSON_CHUNK_ROWS = 1000
+
+
+def parse_layout_options(params):
+    """
+    Read ``layout`` and ``precision`` from request parameters.
+
+    Args:
+        params (dict): Query parameters or validated request data.
+
+    Returns:
+        tuple: (layout, precision or None).
+
+    Raises:
+        ValueError: If either option is invalid.
+    """
+    layout = params.get('layout') or 'records'
+    if layout not in RESPONSE_LAYOUTS:
+        raise ValueError(
+            f"Unknown layout: {layout}. Use one of: {', '.join(RESPONSE_LAYOUTS)}")
+
+    precision = params.get('precision')
+    if precision in (None, ''):
+        return layout, None
+    try:
+        precision = int(precision)
+    except (TypeError, ValueError):
+        raise ValueError("precision must be an integer")
+    if not 0 <= precision <= MAX_PRECISION:
+        raise ValueError(f"precision must be between 0 and {MAX_PRECISION}")
+    return layout, precision
+
+
+def column_values(values, precision=None):
+    """
+    Convert a numeric array into a JSON-ready list.
+
+    Values are optionally rounded to ``precision`` decimals, and NaN or
+    infinite values become None.
+    """
+    values = np.asarray(values, dtype='float64')
+    if precision is not None:
+        values = np.round(values, precision)
+
+    finite = np.isfinite(values)
+    if finite.all():
+        return values.tolist()
+
+    result = values.tolist()
+    for position in np.flatnonzero(~finite).tolist():
+        result[position] = None
+    return result
+
+
+def columnar_frame(frame, precision=None, date_column='Date', as_arrays=False):
+    """
+    Build the columnar payload of a ``get_stock_data`` frame.
+
+    Args:
+        frame (pandas.DataFrame): Frame with a date column.
+        precision (int): Decimals to round values to.
+        date_column (str): Name of the date column.
+        as_arrays (bool): Keep NumPy arrays (dates as ``datetime64``) for the
+            binary renderers instead of building Python lists.
+
+    Returns:
+        dict: ``{'dates': [...], 'columns': {name: [...]}}``.
+    """
+    names = [name for name in frame.columns if name != date_column]
+    if as_arrays:
+        return {
+            'dates': _date_array(frame[date_column]),
+            'columns': {name: _float_array(frame[name], precision) for name in names},
+        }
+    return {
+        'dates': frame[date_column].astype(str).tolist(),
+        'columns': {
+            name: column_values(frame[name].to_numpy(), precision)
+            for name in names
+        },
+    }
+
+
+def columnar_indicators(result, precision=None, as_arrays=False):
+    """
+    Build the columnar payload of a ``calculate_technical_indicators`` result.
+
+    Every indicator shares one date array; values are aligned with it and
+    are None (NaN with ``as_arrays``) where the indicator is not defined yet.
+
+    Returns:
+        dict: ``{'dates': [...], 'columns': {name: [...]}}``.
+    """
+    dates = result.get('Date')
+    names = [name for name in result if name != 'Date']
+    if as_arrays:
+        return {
+            'dates': _date_array([] if dates is None else dates),
+            'columns': {name: _float_array(result[name], precision) for name in names},
+        }
+    return {
+        'dates': [] if dates is None else dates.astype(str).tolist(),
+        'columns': {
+            name: column_values(result[name].to_numpy(), precision)
+            for name in names
+        },
+    }
+
+
+def _float_array(values, precision=None):
+    """Contiguous float64 array of a column, rounded (a copy) if requested."""
+    values = np.ascontiguousarray(np.asarray(values, dtype='float64'))
+    if precision is not None:
+        values = np.round(values, precision)
+    return values
+
+
+def _date_array(dates):
+    """Dates (strings or timestamps) parsed into a ``datetime64[ns]`` array."""
+    return pd.to_datetime(pd.Series(dates)).to_numpy(dtype='datetime64[ns]')
+
+
+def round_records(frame, precision=None):
+    """Return the row-per-dict layout, rounded to ``precision`` if given."""
+    if precision is not None:
+        frame = frame.round(precision)
+    return frame.to_dict(orient='records')
+
+
+def ndjson_rows(frame, precision=None, date_column='Date',
+                chunk_size=NDJSON_CHUNK_ROWS):
+    """
+    Serialize a frame as newline-delimited JSON, one row per line.
+
+    Rows are built ``chunk_size`` at a time from slices of the column
+    arrays, so only one chunk of Python objects exists at any moment
+    however long the frame is.
+
+    Args:
+        frame (pandas.DataFrame): Frame with a date column.
+        precision (int): Decimals to round values to.
+        date_column (str): Name of the date column.
+        chunk_size (int): Rows per yielded chunk.
+
+    Yields:
+        bytes: Chunks of NDJSON lines, each ending with a newline.
+    """
+    names = [date_column] + [name for name in frame.columns if name != date_column]
+    dates = frame[date_column].to_numpy()
+    values = {name: frame[name].to_numpy() for name in names[1:]}
+    dumps = _dumps_bytes()
+
+    for start in range(0, len(frame), chunk_size):
+        stop = start + chunk_size
+        columns = [[str(date) for date in dates[start:stop]]]
+        columns.extend(column_values(values[name][start:stop], precision)
+                       for name in names[1:])
+        yield b''.join(dumps(dict(zip(names, row))) + b'\n'
+                       for row in zip(*columns))
+
+
+def ndjson_objects(objects):
+    """
+    Serialize objects as newline-delimited JSON, one line per object.
+
+    Each line is produced when its object arrives, so a client can act on
+    the first results while later ones are still being computed. Timestamps
+    are written in ISO format and NumPy scalars as plain numbers.
+
+    Yields:
+        bytes: One NDJSON line per object.
+    """
+    dumps = _dumps_bytes(default=_json_default)
+    for obj in objects:
+        yield dumps(obj) + b'\n'
+
+
+def _json_default(obj):
+    """Encode the values pandas and NumPy leave in records."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _dumps_bytes(default=None):
+    """Return a function serializing one object to compact JSON bytes."""
+    if orjson is not None:
+        if default is None:
+            return orjson.dumps
+        return lambda obj: orjson.dumps(obj, default=default)
+    return lambda obj: json.dumps(obj, separators=(',', ':'),
+                                  default=default).encode()
@@ -0,0 +1,379 @@
+"""
+Ranked typeahead search over the exchange listing.
+
+The listing (NSE and BSE securities) is read from a local master file,
+``settings.SYMBOL_MASTER_FILE``, and indexed once; the popular stocks are
+used when there is no master file. Matches are ranked in tiers:
+
+1. exact symbol
+2. symbol prefix
+3. name prefix
+4. every query word is a prefix of a word of the symbol or name
+5. the query appears anywhere in the symbol or name
+6. every query word is within a few typos of a word (or word prefix)
+
+Prefix lookups bisect sorted key lists; substring and typo lookups use
+trigram inverted indexes to find candidates before checking them. Lower
+tiers are only searched when the higher ones did not fill the result, and
+within a tier shorter symbols come first, then listing order.
+
+The master file is checked for changes at most every
+``settings.SYMBOL_MASTER_CHECK_INTERVAL`` seconds and the index rebuilt when
+it changed, while searches keep using the previous index.
+"""
+import bisect
+import csv
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+# Exchange suffix of qualified symbols
+EXCHANGE_SUFFIXES = {'NSE': '.NS', 'BSE': '.BO'}
+
+# Accepted master file column names (lowercase) for each field; the NSE and
+# BSE equity listing downloads use the latter names
+COLUMN_ALIASES = {
+    'symbol': ('symbol', 'security id'),
+    'name': ('name', 'name of company', 'security name', 'issuer name'),
+    'exchange': ('exchange',),
+    'sector': ('sector', 'industry'),
+}
+
+_WORD = re.compile(r'[A-Z0-9]+')
+
+
+def _normalize(text):
+    """Uppercase words of ``text`` joined by single spaces."""
+    return ' '.join(_WORD.findall(text.upper()))
+
+
+def _base_symbol(symbol):
+    """Symbol without its exchange suffix."""
+    for suffix in EXCHANGE_SUFFIXES.values():
+        if symbol.upper().endswith(suffix):
+            return symbol[:-len(suffix)]
+    return symbol
+
+
+def _trigrams(term):
+    """Trigrams of a term padded at both ends."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(term):
+    """Edits allowed when matching a query word of this length."""
+    if len(term) < 4:
+        return 0
+    if len(term) < 8:
+        return 1
+    return 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (adjacent swaps count as one edit).
+
+    Returns:
+        int: The distance, or ``limit + 1`` once it is known to exceed
+        ``limit``.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2]
+                    and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def read_listing(path):
+    """
+    Read securities from a CSV master file.
+
+    Symbols without an exchange suffix get the suffix of the row's
+    exchange (NSE when the file has no exchange column).
+
+    Args:
+        path (str or Path): CSV file with a header row.
+
+    Returns:
+        list: Dicts with 'symbol', 'name', 'exchange' and 'sector'.
+    """
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        reader = csv.DictReader(handle)
+        headers = {name.strip().lower(): name for name in reader.fieldnames or ()}
+        columns = {
+            field: next((headers[alias] for alias in aliases if alias in headers),
+                        None)
+            for field, aliases in COLUMN_ALIASES.items()
+        }
+        if columns['symbol'] is None or columns['name'] is None:
+            raise ValueError(f"{path}: needs a symbol and a name column")
+
+        stocks = []
+        for row in reader:
+            def value(field):
+                column = columns[field]
+                return (row.get(column) or '').strip() if column else ''
+
+            symbol = value('symbol').upper()
+            if not symbol:
+                continue
+            exchange = value('exchange').upper() or 'NSE'
+            if _base_symbol(symbol) == symbol:
+                symbol += EXCHANGE_SUFFIXES.get(exchange, '')
+            stocks.append({'symbol': symbol, 'name': value('name'),
+                           'exchange': exchange, 'sector': value('sector')})
+        return stocks
+
+
+class SymbolIndex:
+    """
+    Search index over a list of securities.
+
+    Args:
+        stocks (list): Dicts with at least 'symbol' and 'name'; results are
+            these dicts.
+    """
+
+    def __init__(self, stocks):
+        self.stocks = list(stocks)
+        self._symbols = [_normalize(_base_symbol(stock['symbol'])).replace(' ', '')
+                         for stock in self.stocks]
+        self._names = [_normalize(stock['name']) for stock in self.stocks]
+        self._texts = [f"{symbol} {name}"
+                       for symbol, name in zip(self._symbols, self._names)]
+
+        self._exact = defaultdict(list)
+        for position, symbol in enumerate(self._symbols):
+            self._exact[symbol].append(position)
+
+        # Sorted (key, position) pairs for prefix lookups
+        self._symbol_keys = sorted(zip(self._symbols, range(len(self.stocks))))
+        self._name_keys = sorted(zip(self._names, range(len(self.stocks))))
+
+        # Words of the symbol and name, each with the securities holding it
+        words = defaultdict(set)
+        for position, text in enumerate(self._texts):
+            for word in text.split():
+                words[word].add(position)
+        self._words = dict(words)
+        self._word_keys = sorted(self._words)
+
+        # Trigram inverted indexes: over whole texts for substrings, over
+        # words for typo candidates
+        self._text_grams = defaultdict(set)
+        for position, text in enumerate(self._texts):
+            for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                self._text_grams[gram].add(position)
+        self._word_grams = defaultdict(set)
+        for word in self._words:
+            for gram in _trigrams(word):
+                self._word_grams[gram].add(word)
+
+    def __len__(self):
+        return len(self.stocks)
+
+    def search(self, query, limit=10):
+        """
+        Return the best matching securities for a query.
+
+        Args:
+            query (str): Symbol or name fragment; an exchange suffix is
+                ignored.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list: Security dicts, best match first.
+        """
+        text = _normalize(_base_symbol(query.strip()))
+        if not text:
+            return []
+        compact = text.replace(' ', '')
+        words = text.split()
+
+        tiers = (
+            lambda: self._exact.get(compact, ()),
+            lambda: self._prefixed(self._symbol_keys, compact),
+            lambda: self._prefixed(self._name_keys, text),
+            lambda: self._word_prefixed(words),
+            lambda: self._containing(text),
+            lambda: self._fuzzy(words),
+        )
+
+        found = []
+        seen = set()
+        for tier in tiers:
+            matches = [position for position in tier() if position not in seen]
+            matches.sort(key=lambda position: (len(self._symbols[position]),
+                                               position))
+            found.extend(matches)
+            seen.update(matches)
+            if len(found) >= limit:
+                break
+
+        return [self.stocks[position] for position in found[:limit]]
+
+    @staticmethod
+    def _prefixed(keys, prefix):
+        """Positions whose key starts with ``prefix``."""
+        start = bisect.bisect_left(keys, (prefix,))
+        positions = []
+        for key, position in keys[start:]:
+            if not key.startswith(prefix):
+                break
+            positions.append(position)
+        return positions
+
+    def _words_with_prefix(self, prefix):
+        positions = set()
+        start = bisect.bisect_left(self._word_keys, prefix)
+        for word in self._word_keys[start:]:
+            if not word.startswith(prefix):
+                break
+            positions |= self._words[word]
+        return positions
+
+    def _word_prefixed(self, words):
+        """Positions where every query word prefixes one of their words."""
+        positions = None
+        for word in words:
+            matches = self._words_with_prefix(word)
+            positions = matches if positions is None else positions & matches
+            if not positions:
+                return ()
+        return positions
+
+    def _containing(self, text):
+        """Positions whose symbol or name contains ``text``."""
+        if len(text) < 3:
+            return ()
+        grams = sorted((self._text_grams.get(text[i:i + 3], set())
+                        for i in range(len(text) - 2)), key=len)
+        candidates = set.intersection(*grams)
+        return [position for position in candidates
+                if text in self._texts[position]]
+
+    def _fuzzy(self, words):
+        """Positions where every query word matches a word within its typos."""
+        positions = None
+        for word in words:
+            limit = max_typos(word)
+            if limit == 0:
+                matches = self._words_with_prefix(word)
+            else:
+                # Many candidates share a start, so each distinct string is
+                # only compared once
+                close = {}
+
+                def is_close(text):
+                    if text not in close:
+                        close[text] = edit_distance(word, text, limit) <= limit
+                    return close[text]
+
+                matches = set()
+                for candidate in self._typo_candidates(word, limit):
+                    # Typeahead input may be a misspelt start of the word
+                    if ((abs(len(candidate) - len(word)) <= limit
+                         and is_close(candidate))
+                            or is_close(candidate[:len(word)])):
+                        matches |= self._words[candidate]
+            positions = matches if positions is None else positions & matches
+            if not positions:
+                return ()
+        return positions
+
+    def _typo_candidates(self, word, limit):
+        """Words sharing enough trigrams with ``word`` to be within ``limit``."""
+        grams = _trigrams(word)
+        # Each edit changes at most three trigrams; the prefix form of a
+        # longer word still shares the leading ones
+        needed = max(1, len(grams) - 3 * limit - 1)
+        counts = defaultdict(int)
+        for gram in grams:
+            for candidate in self._word_grams.get(gram, ()):
+                counts[candidate] += 1
+        return [candidate for candidate, count in counts.items()
+                if count >= needed]
+
+
+def _listing_stamp(path):
+    """Modification time and size of the master file, or None if missing."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _build_index(path, stamp):
+    if stamp is None:
+        from .data_service import get_popular_indian_stocks
+        return SymbolIndex(get_popular_indian_stocks())
+    return SymbolIndex(read_listing(path))
+
+
+_index = None
+_index_stamp = None
+_index_checked_at = 0.0
+_index_guard = threading.Lock()
+
+
+def get_symbol_index():
+    """
+    Return the index of the master file, rebuilding it when the file changed.
+
+    While one caller rebuilds, the others keep searching the previous index.
+    A master file that cannot be read leaves the previous index in place.
+    """
+    global _index, _index_stamp, _index_checked_at
+
+    def checked_recently():
+        return (_index is not None
+                and time.monotonic() - _index_checked_at
+                < settings.SYMBOL_MASTER_CHECK_INTERVAL)
+
+    if checked_recently():
+        return _index
+
+    if not _index_guard.acquire(blocking=_index is None):
+        return _index
+    try:
+        if checked_recently():
+            return _index
+
+        path = settings.SYMBOL_MASTER_FILE
+        stamp = _listing_stamp(path)
+        if _index is None or stamp != _index_stamp:
+            try:
+                _index = _build_index(path, stamp)
+            except Exception as e:
+                print(f"Error loading symbol master file {path}: {e}")
+                if _index is None:
+                    _index = _build_index(path, None)
+            # A broken file is retried once it changes again
+            _index_stamp = stamp
+        _index_checked_at = time.monotonic()
+        return _index
+    finally:
+        _index_guard.release()
+
+
+def search_symbols(query, limit=10):
+    """Search the exchange listing; see ``SymbolIndex.search``."""
+    return get_symbol_index().search(query, limit)
@@ -97,50 +97,338 @@ def calculate_bollinger_bands(data, window=20, num_std=2):
     
     return upper_band, middle_band, lower_band
 
-def calculate_technical_indicators(data, indicators=None):
+class IndicatorEngine:
+    """
+    Computes indicators for one price series, sharing intermediates.
+
+    The close column is extracted once as a contiguous float64 array. Rolling
+    means and standard deviations of any window are derived from a single
+    pair of prefix sums, and every EMA is computed once per span and reused
+    (e.g. EMA_12/EMA_26 by both the 'ema' and 'macd' families).
+
+    Args:
+        data (pandas.DataFrame): DataFrame containing stock price data.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.index = data.index
+        self.close = np.ascontiguousarray(
+            np.asarray(data['Close'], dtype='float64').reshape(-1))
+        self._memo = {}
+
+    def _cached(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def _prefix_sums(self):
+        """Shifted prefix sums of close and its square, and of valid bars."""
+        def compute():
+            # Shifting by the first price keeps the sums of squares small,
+            # which avoids cancellation when taking variances
+            valid = ~np.isnan(self.close)
+            shift = self.close[valid][0] if valid.any() else 0.0
+            # Missing closes add nothing to the sums and are counted apart,
+            # so they only void the windows that contain them
+            centered = np.where(valid, self.close - shift, 0.0)
+            sums = np.concatenate(([0.0], np.cumsum(centered)))
+            squares = np.concatenate(([0.0], np.cumsum(centered * centered)))
+            counts = np.concatenate(([0], np.cumsum(valid)))
+            return shift, sums, squares, counts
+        return self._cached(('prefix_sums',), compute)
+
+    def _window_sums(self, window):
+        """
+        Window sums of close and close squared.
+
+        Like pandas' ``rolling(window)``, a window holding a missing close
+        has no value.
+        """
+        shift, sums, squares, counts = self._prefix_sums()
+        n = len(self.close)
+        window_sum = np.full(n, np.nan)
+        window_squares = np.full(n, np.nan)
+        if window <= n:
+            complete = (counts[window:] - counts[:n - window + 1]) == window
+            window_sum[window - 1:] = np.where(
+                complete, sums[window:] - sums[:n - window + 1], np.nan)
+            window_squares[window - 1:] = np.where(
+                complete, squares[window:] - squares[:n - window + 1], np.nan)
+        return shift, window_sum, window_squares
+
+    def rolling_mean(self, window):
+        """Simple moving average of close over ``window`` bars."""
+        def compute():
+            shift, window_sum, _ = self._window_sums(window)
+            return window_sum / window + shift
+        return self._cached(('mean', window), compute)
+
+    def rolling_std(self, window):
+        """Sample standard deviation (ddof=1) of close over ``window`` bars."""
+        def compute():
+            _, window_sum, window_squares = self._window_sums(window)
+            variance = (window_squares - window_sum * window_sum / window) / (window - 1)
+            return np.sqrt(np.maximum(variance, 0.0))
+        return self._cached(('std', window), compute)
+
+    def ema(self, span):
+        """Exponential moving average of close (``adjust=False``)."""
+        return self._cached(('ema', span),
+                            lambda: _ema(self.close, span))
+
+    def _gain_loss_sums(self):
+        """Prefix sums of per-bar gains and losses, shared by every RSI window."""
+        def compute():
+            delta = np.diff(self.close, prepend=np.nan)
+            gain = np.where(delta > 0, delta, 0.0)
+            loss = np.where(delta < 0, -delta, 0.0)
+            return (np.concatenate(([0.0], np.cumsum(gain))),
+                    np.concatenate(([0.0], np.cumsum(loss))))
+        return self._cached(('gain_loss_sums',), compute)
+
+    def rsi(self, window=14):
+        """Relative Strength Index over simple rolling averages."""
+        def compute():
+            gain_sums, loss_sums = self._gain_loss_sums()
+            avg_gain = _window_mean(gain_sums, window)
+            avg_loss = _window_mean(loss_sums, window)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rs = avg_gain / avg_loss
+                return 100 - (100 / (1 + rs))
+        return self._cached(('rsi', window), compute)
+
+    def macd(self, fast_window=12, slow_window=26, signal_window=9):
+        """MACD line, signal line and histogram."""
+        def compute():
+            macd = self.ema(fast_window) - self.ema(slow_window)
+            signal = _ema(macd, signal_window)
+            return macd, signal, macd - signal
+        return self._cached(('macd', fast_window, slow_window, signal_window),
+                            compute)
+
+    def bollinger_bands(self, window=20, num_std=2):
+        """Upper, middle and lower Bollinger Bands."""
+        middle = self.rolling_mean(window)
+        band = self.rolling_std(window) * num_std
+        return middle + band, middle, middle - band
+
+    def series(self, values):
+        """Wrap an array as a Series aligned with the input data."""
+        return pd.Series(values, index=self.index)
+
+    def compute_request(self, family, params):
+        """
+        Calculate one indicator family for one parameter set.
+
+        Args:
+            family (str): Indicator family, e.g. 'sma'.
+            params (dict): Its parameters, e.g. ``{'window': 50}``.
+
+        Returns:
+            dict: Output column name to Series.
+        """
+        names = indicator_columns(family, params)
+
+        if family == 'sma':
+            values = [self.rolling_mean(params['window'])]
+        elif family == 'ema':
+            values = [self.ema(params['window'])]
+        elif family == 'rsi':
+            values = [self.rsi(params['window'])]
+        elif family == 'macd':
+            values = self.macd(params['fast_window'], params['slow_window'],
+                               params['signal_window'])
+        elif family == 'bollinger_bands':
+            values = self.bollinger_bands(params['window'], params['num_std'])
+        else:
+            raise ValueError(f"Unknown indicator: {family}")
+
+        return {name: self.series(value) for name, value in zip(names, values)}
+
+    def compute(self, indicators, parameters=None):
+        """
+        Calculate the requested indicator families.
+
+        Every parameter set is resolved first; the rolling means, standard
+        deviations and EMAs they need are then evaluated once each from the
+        shared prefix sums, in whatever order the requests reach them.
+
+        Args:
+            indicators (list): Indicator families ('sma', 'ema', 'rsi',
+                'macd', 'bollinger_bands').
+            parameters (dict): Optional parameter sets per family, see
+                ``resolve_indicator_requests``.
+
+        Returns:
+            dict: Indicator name to Series, plus the ``Date`` column.
+        """
+        result = {}
+
+        for family, params in resolve_indicator_requests(indicators, parameters):
+            result.update(self.compute_request(family, dict(params)))
+            result['Date'] = self.data['Date']
+
+        return result
+
+
+# Parameter sets computed when a request names a family without parameters
+DEFAULT_INDICATOR_PARAMETERS = {
+    'sma': [{'window': 20}, {'window': 50}, {'window': 200}],
+    'ema': [{'window': 12}, {'window': 26}],
+    'rsi': [{'window': 14}],
+    'macd': [{'fast_window': 12, 'slow_window': 26, 'signal_window': 9}],
+    'bollinger_bands': [{'window': 20, 'num_std': 2}],
+}
+
+# Parameters that are bar counts
+_WINDOW_PARAMS = {'window', 'fast_window', 'slow_window', 'signal_window'}
+
+# Upper bound on parameter sets per request, to keep a request bounded
+MAX_PARAMETER_SETS = 64
+
+
+def _normalize_params(family, params):
+    """Validate one parameter set against the family's defaults."""
+    defaults = DEFAULT_INDICATOR_PARAMETERS[family][0]
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(
+            f"Unknown parameters for {family}: {', '.join(sorted(unknown))}")
+
+    resolved = dict(defaults, **params)
+    for name, value in resolved.items():
+        if name in _WINDOW_PARAMS:
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"{family} {name} must be an integer")
+            # A sample standard deviation needs at least two bars
+            minimum = 2 if family == 'bollinger_bands' else 1
+            if value < minimum:
+                raise ValueError(f"{family} {name} must be at least {minimum}")
+        elif name == 'num_std':
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"{family} num_std must be a number")
+
+    return tuple(sorted(resolved.items()))
+
+
+def resolve_indicator_requests(indicators, parameters=None):
+    """
+    Expand indicator families and parameter sets into individual requests.
+
+    Parameters for a family may be given as a list of parameter dicts, a
+    single dict, or ``{'windows': [...]}`` as a shorthand for several
+    single-window sets::
+
+        {'sma': {'windows': [5, 10, 20, 50, 100, 200]},
+         'bollinger_bands': [{'window': 20, 'num_std': 2},
+                             {'window': 20, 'num_std': 2.5}]}
+
+    Families without parameters use ``DEFAULT_INDICATOR_PARAMETERS``.
+    Unknown family names are ignored, as before.
+
+    Args:
+        indicators (list): Indicator families to calculate.
+        parameters (dict): Optional parameter sets per family.
+
+    Returns:
+        list: Unique ``(family, params)`` pairs in request order, where
+        ``params`` is a sorted tuple of ``(name, value)`` items.
+
+    Raises:
+        ValueError: If a parameter set is invalid.
+    """
+    parameters = {key.lower(): value for key, value in (parameters or {}).items()}
+    requests = []
+
+    for indicator in indicators:
+        family = indicator.lower()
+        if family not in DEFAULT_INDICATOR_PARAMETERS:
+            continue
+
+        spec = parameters.get(family)
+        if spec is None:
+            param_sets = DEFAULT_INDICATOR_PARAMETERS[family]
+        elif isinstance(spec, dict) and 'windows' in spec:
+            extra = {k: v for k, v in spec.items() if k != 'windows'}
+            if not isinstance(spec['windows'], list):
+                raise ValueError(f"{family} windows must be a list")
+            param_sets = [dict(extra, window=window) for window in spec['windows']]
+        elif isinstance(spec, dict):
+            param_sets = [spec]
+        elif isinstance(spec, list) and all(isinstance(item, dict) for item in spec):
+            param_sets = spec
+        else:
+            raise ValueError(f"Invalid parameters for {family}")
+
+        for params in param_sets:
+            request = (family, _normalize_params(family, params))
+            if request not in requests:
+                requests.append(request)
+
+    if len(requests) > MAX_PARAMETER_SETS:
+        raise ValueError(
+            f"At most {MAX_PARAMETER_SETS} indicator parameter sets are allowed")
+
+    return requests
+
+
+def indicator_columns(family, params):
+    """
+    Return the output column names of one indicator request.
+
+    The default parameter sets keep their historical names ('RSI',
+    'MACD', 'BB_Upper', ...); other sets get their parameters appended.
+    """
+    params = dict(params)
+
+    if family == 'sma':
+        return [f"SMA_{params['window']}"]
+    if family == 'ema':
+        return [f"EMA_{params['window']}"]
+
+    defaults = DEFAULT_INDICATOR_PARAMETERS[family][0]
+    suffix = ''
+    if params != defaults:
+        suffix = '_' + '_'.join(f'{params[name]:g}' for name in defaults)
+
+    if family == 'rsi':
+        return [f'RSI{suffix}']
+    if family == 'macd':
+        return [f'MACD{suffix}', f'MACD_Signal{suffix}', f'MACD_Histogram{suffix}']
+    if family == 'bollinger_bands':
+        return [f'BB_Upper{suffix}', f'BB_Middle{suffix}', f'BB_Lower{suffix}']
+    raise ValueError(f"Unknown indicator: {family}")
+
+
+def _window_mean(sums, window):
+    """Trailing mean over ``window`` elements from a prefix-sum array."""
+    n = len(sums) - 1
+    result = np.full(n, np.nan)
+    if window <= n:
+        result[window - 1:] = (sums[window:] - sums[:n - window + 1]) / window
+    return result
+
+
+def _ema(values, span):
+    """Exponential moving average with ``adjust=False`` semantics."""
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def calculate_technical_indicators(data, indicators=None, parameters=None):
     """
     Calculate various technical indicators for the given stock data.
     
     Args:
         data (pandas.DataFrame): DataFrame containing stock price data.
         indicators (list): List of indicators to calculate.
+        parameters (dict): Optional parameter sets per indicator, see
+            ``resolve_indicator_requests``.
     
     Returns:
-        pandas.DataFrame: DataFrame containing all calculated indicators.
+        dict: Indicator name to pandas.Series, plus the ``Date`` column.
     """
     if indicators is None:
         indicators = ['sma', 'ema', 'rsi', 'macd', 'bollinger_bands']
-    
-    result = {}
-    
-    for indicator in indicators:
-        if indicator.lower() == 'sma':
-            result['SMA_20'] = calculate_sma(data, 20)
-            result['SMA_50'] = calculate_sma(data, 50)
-            result['SMA_200'] = calculate_sma(data, 200)
-            result['Date'] = data['Date']
-            
-        elif indicator.lower() == 'ema':
-            result['EMA_12'] = calculate_ema(data, 12)
-            result['EMA_26'] = calculate_ema(data, 26)
-            result['Date'] = data['Date']
-            
-        elif indicator.lower() == 'rsi':
-            result['RSI'] = calculate_rsi(data)
-            result['Date'] = data['Date']
-            
-        elif indicator.lower() == 'macd':
-            macd, signal, histogram = calculate_macd(data)
-            result['MACD'] = macd
-            result['MACD_Signal'] = signal
-            result['MACD_Histogram'] = histogram
-            result['Date'] = data['Date']
-            
-        elif indicator.lower() == 'bollinger_bands':
-            upper, middle, lower = calculate_bollinger_bands(data)
-            result['BB_Upper'] = upper
-            result['BB_Middle'] = middle
-            result['BB_Lower'] = lower
-            result['Date'] = data['Date']
-    
-    return result
+
+    return IndicatorEngine(data).compute(indicators, parameters)
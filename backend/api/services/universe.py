@@ -0,0 +1,115 @@
+"""
+Shared setup of the jobs that run over the whole stock universe.
+
+The ``precompute`` and ``backtest`` management commands both pick their
+symbols from the popular stocks and the ``StockSymbol`` table, run the work
+across a process pool whose workers set up Django, and end with the same
+summary line. The pieces they share live here.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import CommandError
+
+from .data_service import get_popular_indian_stocks
+from .prediction_service import MODEL_FITTERS
+
+# Where universe symbols come from
+UNIVERSE_SOURCES = ('popular', 'db', 'all')
+
+
+def universe_symbols(source='all'):
+    """
+    Symbols of a universe source, popular stocks first.
+
+    Args:
+        source (str): 'popular' for the popular stocks, 'db' for the
+            ``StockSymbol`` table or 'all' for both.
+
+    Returns:
+        list: Stock symbols (not de-duplicated).
+    """
+    symbols = []
+    if source in ('popular', 'all'):
+        symbols += [stock['symbol'] for stock in get_popular_indian_stocks()]
+    if source in ('db', 'all'):
+        # Imported here: spawned workers import this module for
+        # ``init_worker`` before Django is set up
+        from ..models import StockSymbol
+        symbols += list(StockSymbol.objects.values_list('symbol', flat=True))
+    return symbols
+
+
+def init_worker():
+    """Set up Django in worker processes that were spawned rather than forked."""
+    django.setup()
+
+
+def worker_pool(workers=None):
+    """
+    Process pool for universe jobs.
+
+    Args:
+        workers (int): Worker processes; defaults to the CPU count.
+
+    Returns:
+        ProcessPoolExecutor: Pool whose workers have Django set up.
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+
+
+def add_universe_arguments(parser, models_help):
+    """
+    Add the --workers, --source, --symbols and --models options of a command.
+
+    Args:
+        parser (argparse.ArgumentParser): The command's parser.
+        models_help (str): Help text of --models.
+    """
+    parser.add_argument(
+        '--workers', type=int, default=settings.PRECOMPUTE_WORKERS,
+        help='Worker processes (default: PRECOMPUTE_WORKERS or CPU count)')
+    parser.add_argument(
+        '--source', choices=UNIVERSE_SOURCES, default='all',
+        help='Popular stocks, the StockSymbol table, or both (default)')
+    parser.add_argument(
+        '--symbols', nargs='+',
+        help='Only these symbols instead of a source')
+    parser.add_argument(
+        '--models', nargs='+', choices=list(MODEL_FITTERS),
+        help=models_help)
+
+
+def symbols_from_options(options):
+    """
+    Resolve the symbols of a command run from its universe options.
+
+    Raises:
+        CommandError: If there are no symbols or --workers is below one.
+    """
+    symbols = options['symbols'] or universe_symbols(options['source'])
+    if not symbols:
+        raise CommandError('No symbols to process')
+    if options['workers'] is not None and options['workers'] < 1:
+        raise CommandError('--workers must be at least 1')
+    return symbols
+
+
+def write_summary(command, results, done, elapsed):
+    """
+    Write the closing line of a universe job, as a warning if any symbol failed.
+
+    Args:
+        command (BaseCommand): The running command.
+        results (list): Per-symbol result dicts; failed ones have 'error'.
+        done (str): What happened to the symbols, e.g. 'precomputed'.
+        elapsed (float): Seconds the job took.
+    """
+    failed = sum(1 for result in results if 'error' in result)
+    message = (f"Done: {len(results) - failed} symbols {done}, "
+               f"{failed} failed in {elapsed:.1f}s")
+    if failed:
+        command.stdout.write(command.style.WARNING(message))
+    else:
+        command.stdout.write(command.style.SUCCESS(message))
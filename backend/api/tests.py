@@ -0,0 +1,303 @@
+import json
+import tempfile
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from .serializers import PredictionRequestSerializer
+from .services.forecast_store import ForecastStore
+from .services.indicator_cache import (clear_indicator_cache, data_version,
+                                      get_cached_indicators)
+from .services.model_registry import ModelRegistry
+from .services.online_indicators import (create_online_indicator,
+                                         online_indicator_from_dict)
+from .services.panel_indicators import Panel, calculate_panel_indicators
+from .services.prediction_service import fit_model
+from .services.sample_data import generate_sample_stock_data
+from .services.technical_indicators import (calculate_bollinger_bands,
+                                             calculate_ema, calculate_macd,
+                                             calculate_rsi, calculate_sma,
+                                             calculate_technical_indicators)
+
+
+class OnlineIndicatorTests(SimpleTestCase):
+    """The incremental indicators must match the batch functions bar for bar."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.data = generate_sample_stock_data('RELIANCE.NS', '2019-01-01',
+                                              '2021-12-31')
+
+    def run_online(self, name, data=None, **params):
+        """Feed every close through a fresh indicator and collect its output."""
+        data = self.data if data is None else data
+        indicator = create_online_indicator(name, **params)
+        rows = [indicator.update({'Close': close}) for close in data['Close']]
+        return pd.DataFrame(rows, index=data.index)
+
+    def assertSeriesMatch(self, online, batch):
+        np.testing.assert_array_equal(np.isnan(online.to_numpy()),
+                                      np.isnan(batch.to_numpy()))
+        np.testing.assert_allclose(online.to_numpy(), batch.to_numpy(),
+                                   rtol=1e-9, atol=1e-8, equal_nan=True)
+
+    def test_sma_matches_batch(self):
+        for window in (5, 20, 200):
+            online = self.run_online('sma', window=window)
+            self.assertSeriesMatch(online[f'SMA_{window}'],
+                                   calculate_sma(self.data, window))
+
+    def test_ema_matches_batch(self):
+        for window in (12, 26):
+            online = self.run_online('ema', window=window)
+            self.assertSeriesMatch(online[f'EMA_{window}'],
+                                   calculate_ema(self.data, window))
+
+    def test_rsi_matches_batch(self):
+        online = self.run_online('rsi', window=14)
+        self.assertSeriesMatch(online['RSI'], calculate_rsi(self.data, 14))
+
+    def test_columns_follow_batch_naming(self):
+        data = self.data.reset_index()
+        cases = [
+            ('rsi', {'window': 14}, ['RSI']),
+            ('rsi', {'window': 21}, ['RSI_21']),
+            ('sma', {'window': 50}, ['SMA_50']),
+            ('macd', {'fast_window': 5, 'slow_window': 35, 'signal_window': 9},
+             ['MACD_5_35_9', 'MACD_Signal_5_35_9', 'MACD_Histogram_5_35_9']),
+            ('bollinger_bands', {'window': 20, 'num_std': 2.5},
+             ['BB_Upper_20_2.5', 'BB_Middle_20_2.5', 'BB_Lower_20_2.5']),
+        ]
+        for name, params, columns in cases:
+            online = create_online_indicator(name, **params).update(100.0)
+            self.assertEqual(list(online), columns)
+            batch = calculate_technical_indicators(data, [name], {name: params})
+            self.assertEqual(sorted(batch.keys() - {'Date'}), sorted(columns))
+
+    def test_macd_matches_batch(self):
+        online = self.run_online('macd')
+        macd, signal, histogram = calculate_macd(self.data)
+        self.assertSeriesMatch(online['MACD'], macd)
+        self.assertSeriesMatch(online['MACD_Signal'], signal)
+        self.assertSeriesMatch(online['MACD_Histogram'], histogram)
+
+    def test_bollinger_bands_match_batch(self):
+        online = self.run_online('bollinger_bands', window=20, num_std=2)
+        upper, middle, lower = calculate_bollinger_bands(self.data, 20, 2)
+        self.assertSeriesMatch(online['BB_Upper'], upper)
+        self.assertSeriesMatch(online['BB_Middle'], middle)
+        self.assertSeriesMatch(online['BB_Lower'], lower)
+
+    def test_missing_closes_match_batch(self):
+        data = self.data.copy()
+        data.iloc[[300, 301, 450], data.columns.get_loc('Close')] = np.nan
+
+        for window in (5, 20):
+            online = self.run_online('sma', data, window=window)
+            self.assertSeriesMatch(online[f'SMA_{window}'],
+                                   calculate_sma(data, window))
+        for window in (12, 26):
+            online = self.run_online('ema', data, window=window)
+            self.assertSeriesMatch(online[f'EMA_{window}'],
+                                   calculate_ema(data, window))
+        self.assertSeriesMatch(self.run_online('rsi', data, window=14)['RSI'],
+                               calculate_rsi(data, 14))
+
+        online = self.run_online('macd', data)
+        for column, batch in zip(('MACD', 'MACD_Signal', 'MACD_Histogram'),
+                                 calculate_macd(data)):
+            self.assertSeriesMatch(online[column], batch)
+
+        online = self.run_online('bollinger_bands', data, window=20, num_std=2)
+        for column, batch in zip(('BB_Upper', 'BB_Middle', 'BB_Lower'),
+                                 calculate_bollinger_bands(data, 20, 2)):
+            self.assertSeriesMatch(online[column], batch)
+
+        # The windows recover once the missing closes have left them
+        online = self.run_online('sma', data, window=20)
+        self.assertFalse(np.isnan(online['SMA_20'].iloc[-1]))
+
+    def test_serialized_state_resumes(self):
+        closes = self.data['Close'].tolist()
+        split = len(closes) // 2
+
+        for name in ('sma', 'ema', 'rsi', 'macd', 'bollinger_bands'):
+            uninterrupted = create_online_indicator(name)
+            expected = uninterrupted.warm_up(closes)
+
+            first_half = create_online_indicator(name)
+            first_half.warm_up(closes[:split])
+            payload = json.loads(json.dumps(first_half.to_dict()))
+            resumed = online_indicator_from_dict(payload)
+
+            self.assertEqual(resumed.warm_up(closes[split:]), expected)
+
+
+class IndicatorEngineTests(SimpleTestCase):
+    """The shared-intermediate engine must match the pandas functions."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        data = generate_sample_stock_data('RELIANCE.NS', '2019-01-01',
+                                          '2021-12-31').reset_index()
+        # A missing close must only void the windows that contain it
+        data.loc[300, 'Close'] = np.nan
+        cls.data = data
+        cls.result = calculate_technical_indicators(data)
+
+    def assertSeriesMatch(self, engine, batch):
+        np.testing.assert_array_equal(np.isnan(engine.to_numpy()),
+                                      np.isnan(batch.to_numpy()))
+        np.testing.assert_allclose(engine.to_numpy(), batch.to_numpy(),
+                                   rtol=1e-9, atol=1e-8, equal_nan=True)
+
+    def test_sma_matches_rolling_with_missing_close(self):
+        for window in (20, 50, 200):
+            expected = calculate_sma(self.data, window)
+            self.assertSeriesMatch(self.result[f'SMA_{window}'], expected)
+            self.assertEqual(int(expected.isna().sum()), 2 * window - 1)
+
+    def test_ema_and_macd_match(self):
+        for window in (12, 26):
+            self.assertSeriesMatch(self.result[f'EMA_{window}'],
+                                   calculate_ema(self.data, window))
+        macd, signal, histogram = calculate_macd(self.data)
+        self.assertSeriesMatch(self.result['MACD'], macd)
+        self.assertSeriesMatch(self.result['MACD_Signal'], signal)
+        self.assertSeriesMatch(self.result['MACD_Histogram'], histogram)
+
+    def test_rsi_matches(self):
+        self.assertSeriesMatch(self.result['RSI'], calculate_rsi(self.data, 14))
+
+    def test_bollinger_bands_match(self):
+        upper, middle, lower = calculate_bollinger_bands(self.data, 20, 2)
+        self.assertSeriesMatch(self.result['BB_Upper'], upper)
+        self.assertSeriesMatch(self.result['BB_Middle'], middle)
+        self.assertSeriesMatch(self.result['BB_Lower'], lower)
+
+
+class IndicatorCacheTests(SimpleTestCase):
+    """Cached indicators must follow every change of the bars."""
+
+    def setUp(self):
+        clear_indicator_cache()
+        self.data = generate_sample_stock_data('TCS.NS', '2021-01-01',
+                                               '2021-12-31').reset_index()
+
+    def tearDown(self):
+        clear_indicator_cache()
+
+    def test_new_close_of_latest_bar_is_not_served_stale(self):
+        first = get_cached_indicators('TCS', self.data, ['sma'])
+        self.assertIs(get_cached_indicators('TCS', self.data, ['sma'])['SMA_20'],
+                      first['SMA_20'])
+
+        # The session moves on: same last bar, new close
+        updated = self.data.copy()
+        updated.loc[updated.index[-1], 'Close'] += 50
+        second = get_cached_indicators('TCS', updated, ['sma'])
+        self.assertAlmostEqual(second['SMA_20'].iloc[-1] - first['SMA_20'].iloc[-1],
+                               50 / 20)
+
+    def test_empty_window_is_not_cached(self):
+        get_cached_indicators('TCS', self.data.iloc[:0], ['sma'])
+        result = get_cached_indicators('TCS', self.data, ['sma'])
+        self.assertEqual(len(result['SMA_20']), len(self.data))
+
+
+class PanelIndicatorTests(SimpleTestCase):
+    """Panel indicators must match the single-symbol ones on any calendar."""
+
+    def test_symbols_on_different_calendars(self):
+        first = generate_sample_stock_data('TCS.NS', '2019-01-01',
+                                           '2021-12-31').reset_index()
+        # Trades on its own calendar, with gaps the other symbol has not
+        second = generate_sample_stock_data('INFY.NS', '2019-06-01',
+                                            '2021-12-31').reset_index()
+        second = second.drop(index=range(50, 400, 5)).reset_index(drop=True)
+        frames = {'TCS': first, 'INFY': second}
+
+        panel = Panel.from_frames(frames)
+        values = calculate_panel_indicators(panel)
+        for row, (symbol, frame) in enumerate(frames.items()):
+            expected = calculate_technical_indicators(frame)
+            columns = panel.dates.get_indexer(pd.DatetimeIndex(frame['Date']))
+            for name, array in values.items():
+                np.testing.assert_allclose(array[row, columns],
+                                           expected[name].to_numpy(float),
+                                           rtol=1e-9, atol=1e-9,
+                                           err_msg=f"{symbol} {name}")
+
+
+class PrecomputedForecastTests(SimpleTestCase):
+    """Precomputed fits and forecasts must outlive the rolling window."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.data = generate_sample_stock_data('TCS.NS', '2019-01-01',
+                                               '2021-12-31').reset_index()
+        self.data['Date'] = self.data['Date'].astype(str)
+
+    def window(self, today):
+        """The '2y' window a request on ``today`` gets, without new bars."""
+        start = str((pd.Timestamp(today) - pd.DateOffset(years=2)).date())
+        return self.data[self.data['Date'] >= start].reset_index(drop=True)
+
+    def test_next_day_request_hits_the_precomputed_forecast(self):
+        registry = ModelRegistry(self.directory.name)
+        store = ForecastStore(self.directory.name)
+
+        # Precompute on the evening of the last bar
+        tonight = self.window('2021-12-31')
+        version = data_version(tonight)
+        model = registry.get_or_fit('TCS.NS', 'linear',
+                                    calculate_technical_indicators(tonight),
+                                    version)
+        store.write('TCS.NS', 'linear', version, model.forecast(30))
+
+        # The next morning the window has slid but no bar has been added
+        tomorrow = self.window('2022-01-01')
+        self.assertLess(len(tomorrow), len(tonight))
+
+        self.assertIsNotNone(store.read('TCS.NS', 'linear',
+                                        data_version(tomorrow), 7))
+
+        def refit(*args):
+            self.fail('the stored model should have been reused')
+
+        reloaded = ModelRegistry(self.directory.name)
+        self.assertIsNotNone(reloaded.get_or_fit(
+            'TCS.NS', 'linear', calculate_technical_indicators(tomorrow),
+            data_version(tomorrow), fit=refit))
+
+    def test_new_close_of_the_last_bar_misses(self):
+        store = ForecastStore(self.directory.name)
+        data = self.window('2021-12-31')
+        indicators = calculate_technical_indicators(data)
+        store.write('TCS.NS', 'linear', data_version(data),
+                    fit_model('linear', indicators).forecast(30))
+
+        data.loc[data.index[-1], 'Close'] += 1
+        self.assertIsNone(store.read('TCS.NS', 'linear', data_version(data)))
+
+
+class PredictionParameterTests(SimpleTestCase):
+    """Model parameters are checked against the fit function's signature."""
+
+    def is_valid(self, model_type, parameters):
+        return PredictionRequestSerializer(data={
+            'symbol': 'TCS.NS', 'model_type': model_type,
+            'days_to_predict': 30, 'parameters': parameters}).is_valid()
+
+    def test_fitter_keywords_are_accepted(self):
+        self.assertTrue(self.is_valid('lstm', {'window_size': 30,
+                                               'target': 'Close'}))
+
+    def test_unknown_names_are_rejected(self):
+        self.assertFalse(self.is_valid('lstm', {'windowsize': 30}))
+        self.assertFalse(self.is_valid('linear', {'window_size': 30}))
+        self.assertFalse(self.is_valid('lstm', {'df': None}))
@@ -1,20 +1,41 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.API_ASYNC_VIEWS:
+    # Same endpoints, served without blocking the event loop under ASGI
+    from .async_views import (
+        AsyncMarketOverviewView as MarketOverviewView,
+        AsyncPredictionBatchView as PredictionBatchView,
+        AsyncPredictionView as PredictionView,
+        AsyncStockDataBatchView as StockDataBatchView,
+        AsyncStockDataView as StockDataView,
+        AsyncTechnicalIndicatorView as TechnicalIndicatorView,
+    )
+else:
+    from .views import (MarketOverviewView, PredictionBatchView, PredictionView,
+                        StockDataBatchView, StockDataView,
+                        TechnicalIndicatorView)
+
 urlpatterns = [
     # Stock data endpoints
     path('stock-symbols/', views.StockSymbolList.as_view(), name='stock-symbols'),
-    path('stock-data/<str:symbol>/', views.StockDataView.as_view(), name='stock-data'),
+    path('stock-data/batch/', StockDataBatchView.as_view(), name='stock-data-batch'),
+    path('stock-data/<str:symbol>/', StockDataView.as_view(), name='stock-data'),
     
     # Technical indicators
-    path('technical-indicators/', views.TechnicalIndicatorView.as_view(), name='technical-indicators'),
+    path('technical-indicators/', TechnicalIndicatorView.as_view(), name='technical-indicators'),
     
     # Prediction endpoints
     path('prediction-models/', views.PredictionModelList.as_view(), name='prediction-models'),
-    path('predict/', views.PredictionView.as_view(), name='predict'),
+    path('predict/', PredictionView.as_view(), name='predict'),
+    path('predict/batch/', PredictionBatchView.as_view(), name='predict-batch'),
     
     # Market Overview
-    path('market-overview/', views.MarketOverviewView.as_view(), name='market-overview'),
+    path('market-overview/', MarketOverviewView.as_view(), name='market-overview'),
+    
+    # Screener
+    path('screener/', views.ScreenerView.as_view(), name='screener'),
     
     # Search
     path('search-stocks/', views.SearchStocksView.as_view(), name='search-stocks'),
@@ -1,19 +1,40 @@
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from datetime import datetime, timedelta
+import json
 import pandas as pd
 
+from .conditional import compute_etag, not_modified, set_validators
 from .models import StockSymbol, PredictionModel
+from .renderers import BINARY_RENDERERS, is_binary_renderer
 from .serializers import (StockSymbolSerializer, PredictionModelSerializer,
-                          StockDataSerializer, TechnicalIndicatorSerializer,
-                          PredictionRequestSerializer)
-from .services.data_service import get_stock_data, get_nse_indices
-from .services.prediction_service import (predict_with_linear_regression,
-                                          predict_with_random_forest,
-                                          predict_with_svm, predict_with_lstm)
-from .services.technical_indicators import calculate_technical_indicators
+                          StockDataSerializer, StockDataBatchSerializer,
+                          TechnicalIndicatorSerializer,
+                          PredictionRequestSerializer, PredictionBatchSerializer,
+                          ScreenerQuerySerializer)
+from .services.data_service import (get_stock_data, get_stock_data_many,
+                                    get_stock_history, history_version,
+                                    normalize_symbol, prepare_stock_frame)
+from .services.batch_prediction import predict_batch
+from .services.downsampling import downsample_rows, parse_downsample_options
+from .services.market_snapshot import get_market_snapshot
+from .services.screener import screen_stocks
+from .services.serialization import (columnar_frame, columnar_indicators,
+                                     ndjson_objects, ndjson_rows,
+                                     parse_layout_options,
+                                     round_records)
+from .services.prediction_service import MODEL_FITTERS, forecast
+from .services.indicator_cache import data_version, get_cached_indicators
+from .services.forecast_store import get_forecast_store
+from .services.model_registry import get_model_registry
+from .services.prediction_executor import (PredictionQueueFull,
+                                           PredictionTimeout,
+                                           get_prediction_executor)
+from .services.technical_indicators import resolve_indicator_requests
 
 
 class StockSymbolList(generics.ListAPIView):
@@ -34,29 +55,70 @@ class StockSymbolList(generics.ListAPIView):
 
 class StockDataView(APIView):
     """API view to retrieve stock data."""
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + BINARY_RENDERERS
 
     def get(self, request, symbol):
         """Get stock data for a specific symbol."""
         timeframe = request.query_params.get('timeframe', '1y')
 
-        try:
-            # Call the data service to get the stock data
-            data = get_stock_data(symbol, timeframe)
-            data = data.to_dict(orient='records')
-            
-            data2 = []
-            for items in data:
-                clean_data={}
-                for k,v in items.items():
-                    clean_data[k[0]] = v
-                data2.append(clean_data)
-
-                
+        dates = StockDataSerializer(data={
+            'symbol': symbol, 'timeframe': timeframe,
+            **{key: request.query_params[key]
+               for key in ('start_date', 'end_date')
+               if key in request.query_params}})
+        if not dates.is_valid():
+            return Response(dates.errors, status=status.HTTP_400_BAD_REQUEST)
+        start_date = dates.validated_data.get('start_date')
+        end_date = dates.validated_data.get('end_date')
 
-            # Convert DataFrame to dictionary format for response
-            result = {'symbol': symbol, 'data': data2}
+        try:
+            layout, precision = parse_layout_options(request.query_params)
+            points, method = parse_downsample_options(request.query_params)
+            binary = is_binary_renderer(request.accepted_renderer)
 
-            return Response(result)
+            # Call the data service to get the stock data
+            history = get_stock_history(symbol, timeframe, start_date,
+                                        end_date)
+
+            # Answer polling clients from the data version alone; the bar
+            # dates say nothing about when a bar last changed, so the ETag
+            # is the only validator
+            last_bar, rows, last_close = history_version(history)
+            etag = compute_etag('stock-data', normalize_symbol(symbol),
+                                timeframe, last_bar, rows, last_close,
+                                sorted(request.query_params.lists()),
+                                request.accepted_media_type)
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+
+            data = prepare_stock_frame(history)
+
+            # Keep only the rows a chart of ``points`` pixels can show
+            if points is not None:
+                data = data.iloc[downsample_rows(data, points, method)]
+
+            # Stream one JSON object per day instead of building the body
+            if request.query_params.get('stream') in ('1', 'true'):
+                response = StreamingHttpResponse(
+                    ndjson_rows(data, precision),
+                    content_type='application/x-ndjson')
+                response['X-Symbol'] = symbol
+                return set_validators(response, etag)
+
+            # Convert DataFrame to dictionary format for response; binary
+            # formats always get the columnar layout as NumPy arrays
+            if binary:
+                result = {'symbol': symbol, 'layout': 'columnar',
+                          **columnar_frame(data, precision, as_arrays=True)}
+            elif layout == 'columnar':
+                result = {'symbol': symbol, 'layout': layout,
+                          **columnar_frame(data, precision)}
+            else:
+                result = {'symbol': symbol,
+                          'data': round_records(data, precision)}
+
+            return set_validators(Response(result), etag)
 
         except Exception as e:
             print(f"Error: {e}")
@@ -64,20 +126,104 @@ class StockDataView(APIView):
                             status=status.HTTP_400_BAD_REQUEST)
 
 
+class StockDataBatchView(APIView):
+    """API view to retrieve stock data for several symbols at once."""
+
+    def post(self, request):
+        """Get stock data for a list of symbols with one upstream download."""
+        serializer = StockDataBatchSerializer(data=request.data)
+        if serializer.is_valid():
+            symbols = serializer.validated_data['symbols']
+            timeframe = serializer.validated_data['timeframe']
+
+            try:
+                frames = get_stock_data_many(symbols, timeframe)
+
+                # Convert each DataFrame to dictionary format for response
+                result = {
+                    'timeframe': timeframe,
+                    'data': {
+                        symbol: frame.to_dict(orient='records')
+                        for symbol, frame in frames.items()
+                    }
+                }
+
+                return Response(result)
+
+            except Exception as e:
+                return Response({"error": str(e)},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 class TechnicalIndicatorView(APIView):
     """API view to calculate technical indicators."""
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + BINARY_RENDERERS
+
+    def get(self, request):
+        """
+        Calculate technical indicators from query parameters.
+
+        Takes the same fields as POST, with ``indicators`` comma-separated
+        and ``parameters`` as a JSON object. Unlike POST responses, these
+        carry validators and can be cached and revalidated.
+        """
+        params = request.query_params
+        data = {key: params[key]
+                for key in ('symbol', 'timeframe', 'start_date', 'end_date',
+                            'layout', 'precision', 'points', 'downsample')
+                if key in params}
+        data['indicators'] = [
+            name.strip() for value in params.getlist('indicators')
+            for name in value.split(',') if name.strip()
+        ]
+        if 'parameters' in params:
+            try:
+                data['parameters'] = json.loads(params['parameters'])
+            except ValueError:
+                return Response(
+                    {"parameters": ["Must be a JSON object."]},
+                    status=status.HTTP_400_BAD_REQUEST)
+
+        return self._indicators(request, data, conditional=True)
 
     def post(self, request):
         """Calculate technical indicators for a specific stock."""
-        serializer = TechnicalIndicatorSerializer(data=request.data)
+        return self._indicators(request, request.data)
+
+    def _indicators(self, request, request_data, conditional=False):
+        serializer = TechnicalIndicatorSerializer(data=request_data)
         if serializer.is_valid():
             symbol = serializer.validated_data['symbol']
             timeframe = serializer.validated_data['timeframe']
             indicators = serializer.validated_data['indicators']
+            parameters = serializer.validated_data.get('parameters')
+            layout = serializer.validated_data['layout']
+            precision = serializer.validated_data.get('precision')
+            points = serializer.validated_data.get('points')
+            method = serializer.validated_data['downsample']
+            start_date = serializer.validated_data.get('start_date')
+            end_date = serializer.validated_data.get('end_date')
 
             try:
                 # Get the stock data
-                data = get_stock_data(symbol, timeframe)
+                history = get_stock_history(symbol, timeframe, start_date,
+                                            end_date)
+
+                if conditional:
+                    last_bar, rows, last_close = history_version(history)
+                    etag = compute_etag(
+                        'technical-indicators', normalize_symbol(symbol),
+                        timeframe, start_date, end_date, last_bar, rows,
+                        last_close, resolve_indicator_requests(indicators, parameters),
+                        layout, precision, points, method,
+                        request.accepted_media_type)
+                    response = not_modified(request, etag)
+                    if response is not None:
+                        return response
+
+                data = prepare_stock_frame(history)
 
                 if data is None or data.empty:
                     return Response(
@@ -85,18 +231,41 @@ class TechnicalIndicatorView(APIView):
                         status=status.HTTP_404_NOT_FOUND)
 
                 # Calculate the requested technical indicators
-                result = calculate_technical_indicators(data, indicators)
+                result = get_cached_indicators(symbol, data, indicators,
+                                               parameters)
+
+                # Indicators need the full history; only their output is
+                # downsampled, on the same rows as the price chart
+                if points is not None:
+                    rows = downsample_rows(data, points, method)
+                    result = {name: values.iloc[rows]
+                              for name, values in result.items()}
 
                 # Convert DataFrame to dictionary format for response
-                response_data = {
-                    'symbol': symbol,
-                    'indicators': {
-                        indicator: result[indicator].dropna().to_dict()
-                        for indicator in result.keys()
+                if is_binary_renderer(request.accepted_renderer):
+                    response_data = {
+                        'symbol': symbol, 'layout': 'columnar',
+                        **columnar_indicators(result, precision, as_arrays=True)}
+                elif layout == 'columnar':
+                    response_data = {'symbol': symbol, 'layout': layout,
+                                     **columnar_indicators(result, precision)}
+                else:
+                    response_data = {
+                        'symbol': symbol,
+                        'indicators': {
+                            indicator: (
+                                result[indicator].dropna()
+                                if precision is None or indicator == 'Date'
+                                else result[indicator].dropna().round(precision)
+                            ).to_dict()
+                            for indicator in result.keys()
+                        }
                     }
-                }
 
-                return Response(response_data)
+                response = Response(response_data)
+                if conditional:
+                    set_validators(response, etag)
+                return response
 
             except Exception as e:
                 return Response({"error": str(e)},
@@ -122,6 +291,7 @@ class PredictionView(APIView):
             model_type = serializer.validated_data['model_type']
             days_to_predict = serializer.validated_data['days_to_predict']
             features = serializer.validated_data.get('features', None)
+            parameters = serializer.validated_data.get('parameters')
 
             try:
                 # Get historical data for training
@@ -133,32 +303,34 @@ class PredictionView(APIView):
                         {"error": f"No data available for {symbol}"},
                         status=status.HTTP_404_NOT_FOUND)
 
-                # Calculate technical indicators for features
-                tech_indicators = [
-                    'sma', 'ema', 'rsi', 'macd', 'bollinger_bands'
-                ]
-                data_with_indicators = calculate_technical_indicators(
-                    data, tech_indicators)
-
-                # Make predictions based on the model type
-                result = None
-                if model_type == 'linear':
-                    result = predict_with_linear_regression(
-                        data_with_indicators, days_to_predict, features)
-                elif model_type == 'random_forest':
-                    result = predict_with_random_forest(
-                        data_with_indicators, days_to_predict, features)
-                elif model_type == 'svm':
-                    result = predict_with_svm(data_with_indicators,
-                                              days_to_predict, features)
-                elif model_type == 'lstm':
-                    result = predict_with_lstm(data_with_indicators,
-                                               days_to_predict)
-                else:
+                if model_type not in MODEL_FITTERS:
                     return Response(
                         {"error": f"Unknown model type: {model_type}"},
                         status=status.HTTP_400_BAD_REQUEST)
 
+                # Serve the precomputed forecast while it matches these bars
+                result = None
+                if not features and not parameters:
+                    result = get_forecast_store().read(
+                        normalize_symbol(symbol), model_type,
+                        data_version(data), days_to_predict)
+
+                if result is None:
+                    # Calculate technical indicators for features
+                    tech_indicators = [
+                        'sma', 'ema', 'rsi', 'macd', 'bollinger_bands'
+                    ]
+                    data_with_indicators = get_cached_indicators(
+                        symbol, data, tech_indicators)
+
+                    # Reuse the model fitted on these bars, if there is one
+                    # Fits run in the prediction worker processes
+                    model = get_model_registry().get_or_fit(
+                        normalize_symbol(symbol), model_type,
+                        data_with_indicators, data_version(data), features,
+                        parameters, fit=get_prediction_executor().fit)
+                    result = forecast(model, days_to_predict)
+
                 if result is None:
                     return Response(
                         {
@@ -177,10 +349,55 @@ class PredictionView(APIView):
 
                 return Response(response_data)
 
+            except PredictionQueueFull as e:
+                return Response({"error": str(e)},
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                headers={'Retry-After': str(e.retry_after)})
+
+            except PredictionTimeout as e:
+                return Response({"error": str(e)},
+                                status=status.HTTP_504_GATEWAY_TIMEOUT)
+
+            except Exception as e:
+                return Response({"error": str(e)},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PredictionBatchView(APIView):
+    """API view to make predictions for many symbols and models at once."""
+
+    def post(self, request):
+        """
+        Forecast a list of (symbol, model_type, days_to_predict) items.
+
+        The response is streamed as NDJSON, one line per item as its
+        forecast completes; each line carries the item's ``index`` in the
+        request.
+        """
+        serializer = PredictionBatchSerializer(data=request.data)
+        if serializer.is_valid():
+            items = serializer.validated_data['items']
+
+            unknown = sorted({item['model_type'] for item in items}
+                             - set(MODEL_FITTERS))
+            if unknown:
+                return Response(
+                    {"error": f"Unknown model type: {', '.join(unknown)}"},
+                    status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                # Fetch and compute up front so failures get a status code;
+                # only the fits are streamed
+                outcomes = predict_batch(items)
             except Exception as e:
                 return Response({"error": str(e)},
                                 status=status.HTTP_400_BAD_REQUEST)
 
+            return StreamingHttpResponse(ndjson_objects(outcomes),
+                                         content_type='application/x-ndjson')
+
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -190,27 +407,62 @@ class MarketOverviewView(APIView):
     def get(self, request):
         """Get overview of the Indian market indices."""
         try:
-            # Get the major indices data
-            indices_data = get_nse_indices()
+            # Get the latest snapshot of the major indices
+            indices_data, taken_at = get_market_snapshot()
 
             if indices_data is None or indices_data.empty:
                 return Response(
                     {"error": "Failed to retrieve market overview data"},
                     status=status.HTTP_404_NOT_FOUND)
 
+            # The snapshot only changes when it is retaken
+            etag = compute_etag('market-overview', taken_at,
+                                request.accepted_media_type)
+            response = not_modified(request, etag, taken_at)
+            if response is not None:
+                return response
+
             # Convert DataFrame to dictionary format for response
             result = {
                 'indices': indices_data.to_dict(orient='records'),
-                'last_updated': datetime.now().isoformat()
+                'last_updated': taken_at.isoformat()
             }
 
-            return Response(result)
+            return set_validators(Response(result), etag, taken_at)
 
         except Exception as e:
             return Response({"error": str(e)},
                             status=status.HTTP_400_BAD_REQUEST)
 
 
+class ScreenerView(APIView):
+    """API view to screen the stock universe on latest indicator values."""
+
+    def get(self, request):
+        """Filter, sort and limit stocks by their latest indicator values."""
+        serializer = ScreenerQuerySerializer(data=request.query_params)
+        if serializer.is_valid():
+            try:
+                result = screen_stocks(
+                    filters=serializer.validated_data['filter'],
+                    sector=serializer.validated_data.get('sector'),
+                    sort=serializer.validated_data.get('sort'),
+                    limit=serializer.validated_data['limit'])
+
+                if result is None:
+                    return Response(
+                        {"error": "Screener data is not available"},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+                return Response(result)
+
+            except ValueError as e:
+                return Response({"error": str(e)},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 class SearchStocksView(APIView):
     """API view to search for stocks by name or symbol."""
 
@@ -225,8 +477,17 @@ class SearchStocksView(APIView):
                 {"error": "Search query must be at least 2 characters"},
                 status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= 50:
+            return Response(
+                {"error": "limit must be a number from 1 to 50"},
+                status=status.HTTP_400_BAD_REQUEST)
+
         # Use our search function instead of database query
-        matching_stocks = search_indian_stocks(query)
+        matching_stocks = search_indian_stocks(query, limit)
 
         # Transform the data to match our serializer's expected format
         formatted_stocks = [
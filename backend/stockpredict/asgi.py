@@ -8,4 +8,12 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stockpredict.settings')
 
+# Serve the data endpoints with the async views unless told otherwise
+os.environ.setdefault('API_ASYNC_VIEWS', '1')
+
 application = get_asgi_application()
+
+# Build the symbol search index before the first request needs it
+from api.services.symbol_search import get_symbol_index  # noqa: E402
+
+get_symbol_index()
@@ -123,7 +123,112 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.FastJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ]
 }
+
+# Market data settings
+# Source of all upstream price downloads. Other backends in
+# api.services.providers: SampleProvider (synthetic data), RecordingProvider
+# (OPTIONS: directory, backend, options) and ReplayProvider (OPTIONS:
+# directory, latency). A directory or latency missing from OPTIONS comes from
+# MARKET_DATA_DIR and MARKET_DATA_LATENCY below.
+MARKET_DATA_PROVIDER = {
+    'BACKEND': os.getenv('MARKET_DATA_PROVIDER',
+                         'api.services.providers.YFinanceProvider'),
+    'OPTIONS': {},
+}
+
+# Recordings written by RecordingProvider and served by ReplayProvider
+MARKET_DATA_DIR = Path(os.getenv('MARKET_DATA_DIR',
+                                 BASE_DIR / 'var' / 'market_data'))
+
+# Seconds ReplayProvider sleeps per download to simulate the upstream
+MARKET_DATA_LATENCY = float(os.getenv('MARKET_DATA_LATENCY', 0))
+
+# Per-symbol OHLCV history files, refreshed incrementally from yfinance
+HISTORY_STORE_DIR = Path(os.getenv('HISTORY_STORE_DIR', BASE_DIR / 'var' / 'history'))
+
+# Minimum number of seconds between two tail fetches for the same symbol
+HISTORY_REFRESH_INTERVAL = int(os.getenv('HISTORY_REFRESH_INTERVAL', 15 * 60))
+
+# In-process cache of recently served history windows
+STOCK_DATA_CACHE_SIZE = int(os.getenv('STOCK_DATA_CACHE_SIZE', 256))
+STOCK_DATA_CACHE_TTL = int(os.getenv('STOCK_DATA_CACHE_TTL', 60))
+
+# Indices shown in the market overview (symbol -> display name)
+MARKET_INDICES = {
+    '^NSEI': 'NIFTY 50',
+    '^NSEBANK': 'NIFTY BANK',
+    '^CNXIT': 'NIFTY IT',
+    '^CNXAUTO': 'NIFTY AUTO',
+    '^CNXPHARMA': 'NIFTY PHARMA',
+}
+
+# Age in seconds after which the market overview snapshot is refreshed
+MARKET_SNAPSHOT_TTL = int(os.getenv('MARKET_SNAPSHOT_TTL', 60))
+
+# Maximum number of memoized indicator results (one per symbol, data version
+# and indicator family)
+INDICATOR_CACHE_SIZE = int(os.getenv('INDICATOR_CACHE_SIZE', 2048))
+
+# History window used to build the screener snapshot (long enough for SMA_200)
+SCREENER_TIMEFRAME = os.getenv('SCREENER_TIMEFRAME', '1y')
+
+# Seconds clients and shared caches may reuse stock data, indicator and
+# market overview responses before revalidating them with their ETag
+HTTP_CACHE_MAX_AGE = int(os.getenv('HTTP_CACHE_MAX_AGE', 15))
+
+# Fitted prediction models, one artifact per symbol/model/features/parameters,
+# refitted when new bars arrive
+MODEL_REGISTRY_DIR = Path(os.getenv('MODEL_REGISTRY_DIR', BASE_DIR / 'var' / 'models'))
+
+# Number of fitted models kept loaded in memory
+MODEL_REGISTRY_SIZE = int(os.getenv('MODEL_REGISTRY_SIZE', 64))
+
+# Forecasts written by `manage.py precompute` and served by the prediction
+# endpoint while they match the latest bars
+FORECAST_STORE_DIR = Path(os.getenv('FORECAST_STORE_DIR', BASE_DIR / 'var' / 'forecasts'))
+
+# Worker processes used by `manage.py precompute` (default: CPU count)
+PRECOMPUTE_WORKERS = int(os.getenv('PRECOMPUTE_WORKERS', 0)) or None
+
+# Days forecast by `manage.py precompute`; requests up to this horizon are
+# served from the stored forecasts
+PRECOMPUTE_FORECAST_DAYS = int(os.getenv('PRECOMPUTE_FORECAST_DAYS', 365))
+
+# Worker processes running model fits for the prediction endpoint (0 runs
+# fits in the request thread)
+PREDICTION_WORKERS = int(os.getenv('PREDICTION_WORKERS', 2))
+
+# Fits that may wait for a worker; requests beyond that get a 503
+PREDICTION_QUEUE_SIZE = int(os.getenv('PREDICTION_QUEUE_SIZE', 8))
+
+# Seconds a fit may run (or wait for a worker) before it is abandoned; a
+# running fit is killed together with its worker process
+PREDICTION_TIMEOUT = float(os.getenv('PREDICTION_TIMEOUT', 30))
+
+# Maximum concurrent fits per model type (others are limited by the workers)
+PREDICTION_MODEL_CONCURRENCY = {
+    'lstm': int(os.getenv('PREDICTION_LSTM_CONCURRENCY', 1)),
+}
+
+# Retry-After seconds sent with 503 responses when the queue is full
+PREDICTION_RETRY_AFTER = int(os.getenv('PREDICTION_RETRY_AFTER', 5))
+
+# Serve the data, indicator, prediction and market overview endpoints with
+# the async views; enabled by default under the ASGI entry point
+API_ASYNC_VIEWS = os.getenv('API_ASYNC_VIEWS', '0') == '1'
+
+# Threads the async views use for blocking calls (upstream downloads, store
+# reads, waiting on fits); sized for many requests waiting on slow upstream
+# calls at once
+ASYNC_IO_WORKERS = int(os.getenv('ASYNC_IO_WORKERS', 256))
+
+# Master file listing the NSE and BSE securities searched by
+# /api/search-stocks/ (CSV; the popular stocks are searched without it)
+SYMBOL_MASTER_FILE = Path(os.getenv('SYMBOL_MASTER_FILE', BASE_DIR / 'var' / 'symbols.csv'))
+
+# Seconds between checks of the master file for changes
+SYMBOL_MASTER_CHECK_INTERVAL = float(os.getenv('SYMBOL_MASTER_CHECK_INTERVAL', 5))
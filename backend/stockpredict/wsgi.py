@@ -9,3 +9,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stockpredict.settings')
 
 application = get_wsgi_application()
+
+# Build the symbol search index before the first request needs it
+from api.services.symbol_search import get_symbol_index  # noqa: E402
+
+get_symbol_index()